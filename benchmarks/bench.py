@@ -0,0 +1,301 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+import torch
+
+from config.settings import *
+from src.ai.a_star import a_star_search, flood_fill, stay_alive
+from src.ai.features import FeatureExtractor
+from src.ai.learning import DeepQLearningModel
+from src.game.board import Board
+from src.game.food import Food
+from src.game.snake import Snake
+
+# Microbenchmarks for the game and AI hot paths, plus headless ticks/sec per mode.
+#
+#   python -m benchmarks.bench run --output current.json
+#   python -m benchmarks.bench compare current.json
+#
+# Every case is seeded, so two runs on the same machine time exactly the same work.
+# compare exits with status 1 when any case got slower than the threshold allows. The committed
+# benchmarks/baseline.json is a full run with seed 0; its meta records the machine, seed and
+# board sizes. Timings only compare within one machine, so regenerate it before comparing on
+# another one: python -m benchmarks.bench run --output benchmarks/baseline.json
+
+GRID_SIZES = (20, 50, 100, 200)
+SNAKE_LENGTHS = (1, 10, 100, 300)
+QUICK_GRID_SIZES = (20, 100)
+QUICK_SNAKE_LENGTHS = (1, 100)
+HEADLESS_TICKS = 2000
+DEFAULT_THRESHOLD = 0.15  # Relative slowdown reported as a regression
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SETTINGS = ("seed", "quick", "grid_sizes", "snake_lengths", "headless_ticks")  # Meta keys that change the work timed
+
+def cycle_cells(grid_size):
+    # Closed path through every cell of an even-sized grid: along the top row, snake through the
+    # remaining columns row by row and return up column 0. A snake following it never dies.
+    cells = [(x, 0) for x in range(grid_size)]
+    for y in range(1, grid_size):
+        columns = range(grid_size - 1, 0, -1) if y % 2 else range(1, grid_size)
+        cells.extend((x, y) for x in columns)
+    cells.extend((0, y) for y in range(grid_size - 1, 0, -1))
+    return cells
+
+def direction_between(a, b):
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    return {(0, -1): "UP", (0, 1): "DOWN", (-1, 0): "LEFT", (1, 0): "RIGHT"}[(dx, dy)]
+
+class Scenario:
+    # A seeded board with a snake of the given length laid along the cycle and food placed on it
+    def __init__(self, grid_size, length, seed, num_walls=0):
+        random.seed(seed)
+        self.grid_size = grid_size
+        self.cycle = cycle_cells(grid_size)
+        self.board = Board(grid_size, grid_size)
+        for _ in range(num_walls):
+            # Walls off the cycle's first cells, so they never overlap the snake
+            self.board.add_wall(random.choice(self.cycle[length + 1:]))
+
+        self.snake = Snake(self.cycle[0], board=self.board)
+        for cell in self.cycle[1:length]:
+            self.snake.direction = None
+            self.snake.change_direction(direction_between(self.snake.head_position(), cell))
+            self.snake.grow()
+            self.snake.move()
+        self.snake.direction = direction_between(self.cycle[length - 1], self.cycle[length % len(self.cycle)])
+
+        self.food = Food(self.board, self.snake)
+        self.next_direction = {
+            cell: direction_between(cell, self.cycle[(i + 1) % len(self.cycle)])
+            for i, cell in enumerate(self.cycle)
+        }
+
+    def follow_cycle(self):
+        # One tick along the cycle: turn, move and check collisions
+        self.snake.change_direction(self.next_direction[self.snake.head_position()])
+        self.snake.move()
+        self.snake.has_collision(self.board)
+
+def seed_everything(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+def measure(operation, repeat=5):
+    # Median seconds per call, each round sized by timeit to run for about 0.2s
+    timer = timeit.Timer(operation)
+    number, _ = timer.autorange()
+    return statistics.median(timer.repeat(repeat=repeat, number=number)) / number
+
+def model_without_output():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return DeepQLearningModel(state_space_size=11, action_space_size=4)
+
+def scenario_cases(grid_sizes, lengths):
+    for grid_size in grid_sizes:
+        for length in lengths:
+            if length < grid_size * grid_size:
+                yield grid_size, length
+
+def bench_snake(grid_sizes, lengths, seed):
+    for grid_size, length in scenario_cases(grid_sizes, lengths):
+        scenario = Scenario(grid_size, length, seed)
+        yield f"snake_move[grid={grid_size},length={length}]", measure(scenario.follow_cycle)
+
+def bench_food(grid_sizes, lengths, seed):
+    for grid_size, length in scenario_cases(grid_sizes, lengths):
+        scenario = Scenario(grid_size, length, seed)
+        yield f"food_spawn[grid={grid_size},length={length}]", measure(lambda: scenario.food.spawn(scenario.snake.body))
+
+def bench_a_star(grid_sizes, lengths, seed):
+    for grid_size, length in scenario_cases(grid_sizes, lengths):
+        scenario = Scenario(grid_size, length, seed, num_walls=grid_size)
+        start = scenario.snake.head_position()
+        goal = scenario.food.position
+        body = list(scenario.snake.body)
+        walls = scenario.board.walls
+        yield f"a_star_search[grid={grid_size},length={length}]", measure(
+            lambda: a_star_search(start, goal, body, grid_size, grid_size, walls), repeat=3)
+
+def bench_flood_fill(grid_sizes, lengths, seed):
+    for grid_size, length in scenario_cases(grid_sizes, lengths):
+        scenario = Scenario(grid_size, length, seed, num_walls=grid_size)
+        x, y = scenario.cycle[length % len(scenario.cycle)]  # Cell just ahead of the head
+        body = list(scenario.snake.body)
+        walls = scenario.board.walls
+        yield f"flood_fill[grid={grid_size},length={length}]", measure(
+            lambda: flood_fill(x, y, body, walls, grid_size, grid_size), repeat=3)
+
+        direction = scenario.snake.direction
+
+        def keep_alive():
+            stay_alive(scenario.snake, scenario.board)
+            scenario.snake.direction = direction
+
+        yield f"stay_alive[grid={grid_size},length={length}]", measure(keep_alive, repeat=3)
+
+def bench_features(grid_sizes, lengths, seed):
+    model = model_without_output()
+    features = FeatureExtractor()
+    for grid_size, length in scenario_cases(grid_sizes, lengths):
+        scenario = Scenario(grid_size, length, seed)
+        snake, food, board = scenario.snake, scenario.food, scenario.board
+        yield f"get_state[grid={grid_size},length={length}]", measure(lambda: model.get_state(snake, food, board))
+        yield f"get_reward[grid={grid_size},length={length}]", measure(lambda: model.get_reward(snake, food, board))
+        yield f"feature_extract[grid={grid_size},length={length}]", measure(lambda: features.after_move(snake, food, board))
+
+def bench_model(grid_sizes, lengths, seed):
+    seed_everything(seed)
+    model = model_without_output()
+    state = np.random.randint(0, 2, 11)
+    yield "choose_action", measure(lambda: model.choose_action(state, epsilon=0.0))
+
+    batch_size = model.batch_size
+    states = np.random.randint(0, 2, (batch_size, 11))
+    actions = np.random.randint(0, 4, batch_size)
+    rewards = np.random.choice([-10, -1, 2, 20], batch_size)
+    next_states = np.random.randint(0, 2, (batch_size, 11))
+    dones = np.random.random(batch_size) < 0.05
+    yield f"train_step[batch={batch_size}]", measure(
+        lambda: model.train_step(states, actions, rewards, next_states, dones), repeat=3)
+
+def bench_headless(grid_sizes, lengths, seed):
+    # Full Game.update ticks per mode, run in a scratch directory so run history stays untouched
+    from src.game.game import Game
+
+    repo_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.makedirs(os.path.join(scratch, "data"))
+        if os.path.exists(os.path.join(repo_dir, "model.pth")):
+            shutil.copy(os.path.join(repo_dir, "model.pth"), scratch)
+        os.chdir(scratch)
+        try:
+            for mode in (A_STAR_MODE, LEARNING_MODE, TESTING_MODE):
+                seed_everything(seed)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    game = Game(automate=True, max_runs=10**9, testing=mode == TESTING_MODE, headless=True)
+                    game.mode = mode
+                    try:
+                        for _ in range(HEADLESS_TICKS // 10):  # Warm up, e.g. fill the replay buffer
+                            game.update()
+                        start = time.perf_counter()
+                        for _ in range(HEADLESS_TICKS):
+                            game.update()
+                        elapsed = time.perf_counter() - start
+                    finally:
+                        game.close()  # Its metrics and checkpoint threads write to relative paths
+                yield f"headless_tick[mode={mode}]", elapsed / HEADLESS_TICKS
+        finally:
+            os.chdir(repo_dir)
+
+BENCHMARKS = {
+    "snake": bench_snake,
+    "food": bench_food,
+    "a_star": bench_a_star,
+    "flood_fill": bench_flood_fill,
+    "features": bench_features,
+    "model": bench_model,
+    "headless": bench_headless,
+}
+
+def run(output, only=None, quick=False, seed=0):
+    grid_sizes = QUICK_GRID_SIZES if quick else GRID_SIZES
+    lengths = QUICK_SNAKE_LENGTHS if quick else SNAKE_LENGTHS
+    torch.set_num_threads(1)  # Keep train_step timings comparable between machines and runs
+
+    results = {}
+    for group, benchmark in BENCHMARKS.items():
+        if only and group not in only:
+            continue
+        for name, seconds in benchmark(grid_sizes, lengths, seed):
+            results[name] = {"seconds_per_op": seconds, "ops_per_second": 1 / seconds}
+            print(f"{name:<45} {seconds * 1e6:>14.2f} us/op")
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "torch": torch.__version__,
+            "numpy": np.__version__,
+            "seed": seed,
+            "quick": quick,
+            "grid_sizes": list(grid_sizes),
+            "snake_lengths": list(lengths),
+            "headless_ticks": HEADLESS_TICKS,
+        },
+        "results": results,
+    }
+    if output:
+        with open(output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {output}.")
+    return report
+
+def compare(current_path, baseline_path=BASELINE_PATH, threshold=DEFAULT_THRESHOLD):
+    # Returns the names of cases that are more than threshold slower than the baseline
+    with open(baseline_path) as file:
+        baseline_report = json.load(file)
+    with open(current_path) as file:
+        current_report = json.load(file)
+    baseline, current = baseline_report["results"], current_report["results"]
+
+    for key in SETTINGS:
+        baseline_value = baseline_report["meta"].get(key)
+        current_value = current_report["meta"].get(key)
+        if baseline_value != current_value:
+            print(f"Warning: {key} differs, baseline {baseline_value} vs current {current_value}.")
+
+    regressions = []
+    for name in sorted(set(baseline) & set(current)):
+        ratio = current[name]["seconds_per_op"] / baseline[name]["seconds_per_op"]
+        status = ""
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 / (1 + threshold):
+            status = "faster"
+        print(f"{name:<45} {baseline[name]['seconds_per_op'] * 1e6:>12.2f} -> "
+              f"{current[name]['seconds_per_op'] * 1e6:>12.2f} us/op  x{ratio:.2f} {status}")
+
+    for name in sorted(set(baseline) ^ set(current)):
+        print(f"{name:<45} only in {'baseline' if name in baseline else 'current'}")
+
+    print(f"{len(regressions)} regression(s) above {threshold:.0%}.")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the game and AI hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--output", help="JSON file to write the results to")
+    run_parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmark groups to run")
+    run_parser.add_argument("--quick", action="store_true", help="fewer board sizes and snake lengths")
+    run_parser.add_argument("--seed", type=int, default=0)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--baseline", default=BASELINE_PATH, help="defaults to benchmarks/baseline.json")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args.output, only=args.only, quick=args.quick, seed=args.seed)
+        return 0
+    return 1 if compare(args.current, args.baseline, args.threshold) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
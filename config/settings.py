@@ -3,8 +3,10 @@ WIDTH = 400
 LOG_WIDTH = 250      
 HEIGHT = 400         
 
-# Grid/Tiles
-TILE_SIZE = 20
+# Board size in cells, independent of the window: each cell is drawn
+# min(WIDTH // GRID_WIDTH, HEIGHT // GRID_HEIGHT) pixels wide
+GRID_WIDTH = 20
+GRID_HEIGHT = 20
 
 # Colors (RGB format)
 COLOR_BACKGROUND = (0, 0, 0)    # Black
@@ -16,10 +18,12 @@ COLOR_DARK = (162, 209, 73)     # Darker green
 
 # Game Settings
 SNAKE_SPEED = 50
+MAX_SPEED_MULTIPLIER = 1024  # Fast-forward limit for automated modes (+/- keys)
 
 # Mode Constants
 NORMAL_MODE = "normal"
 A_STAR_MODE = "a_star"
 LEARNING_MODE = "learning"
 TESTING_MODE = "testing"
+HAMILTONIAN_MODE = "hamiltonian"
 VERBOSE = False
\ No newline at end of file
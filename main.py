@@ -5,16 +5,31 @@ import pygame
 if __name__ == "__main__":
     try:
         testing = False  # Set to True to enable testing mode
+        resume = False  # Set to True to test the newest training checkpoint instead of model.pth
         max_runs = 100   # Specify # runs
         automate = False  # Set to True to run max_runs automatically
         num_walls = 0 # # of walls in the scene
+        headless = False  # Set to True to run automation without a window or frame limit
+        distributed = False  # Set to True to train the learning model with parallel actor processes
+        num_actors = 8  # Actor processes used for distributed training
+        profile = False  # Set to True to time each phase of the game loop, shown in the side panel
+        evaluation = False  # Set to True to evaluate a controller on max_runs seeded headless games
+        controller = "dqn"  # Controller to evaluate: "dqn" (model.pth), "a_star" or "hamiltonian"
 
-        game = Game(automate=automate, max_runs=max_runs, testing=testing, num_walls=num_walls)
-        
-        if automate:
-            game.mode = A_STAR_MODE
+        # Torch-based entry points are imported only when used, keeping startup fast for other modes
+        if evaluation:
+            from src.ai.evaluation import evaluate, print_summary
+            print_summary(evaluate(controller, num_games=max_runs, num_walls=num_walls))
+        elif distributed:
+            from src.ai.distributed import train_distributed
+            train_distributed(num_actors=num_actors, max_games=max_runs)
+        else:
+            game = Game(automate=automate, max_runs=max_runs, testing=testing, num_walls=num_walls, headless=headless, profile=profile, resume=resume)
 
-        game.run()
+            if automate:
+                game.mode = A_STAR_MODE
+
+            game.run()
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
@@ -1,112 +1,159 @@
 import math 
 import heapq
 import random
+from collections import deque
 
 from config.settings import * 
+from src.ai.reachability import Reachability, blocked_grid, neighbor_table
+
+DIRECTION_OFFSETS = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
 
 class Node:
-    def __init__(self, position, parent=None):
-        self.position = position
+    # Open list entry. Ordered by f_cost only so heapq breaks ties exactly as the original Node did.
+    __slots__ = ("cell", "parent", "g_cost", "f_cost")
+
+    def __init__(self, cell, parent=None, g_cost=0, f_cost=0):
+        self.cell = cell  # Flat grid index: y * grid_width + x
         self.parent = parent
-        self.g_cost = 0
-        self.h_cost = 0
-        self.f_cost = 0
+        self.g_cost = g_cost
+        self.f_cost = f_cost
 
     def __lt__(self, other):
         return self.f_cost < other.f_cost
-    
-def a_star_search(start, goal, snake_body, grid_width, grid_height, walls):
-    open_list = []
-    closed_set = set()
-    start_node = Node(start)
-    goal_node = Node(goal)
-
-    heapq.heappush(open_list, start_node)
+
+def search_grids(snake_body, walls, grid_width, grid_height):
+    # Flat blocked-cell grid plus, for every cell, the number of body segments on or next to it
+    blocked = blocked_grid(snake_body, walls, grid_width, grid_height)
+    penalty = [0] * (grid_width * grid_height)
+
+    for x, y in snake_body:
+        for px, py in ((x, y), (x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y)):
+            if 0 <= px < grid_width and 0 <= py < grid_height:
+                penalty[py * grid_width + px] += 1
+
+    return blocked, penalty
+
+def a_star_search(start, goal, snake_body, grid_width, grid_height, walls, counters=None):
+    # Grid cells are flat indices, the open list uses lazy deletion: a cell is pushed again only
+    # with a strictly lower f_cost, and stale copies are skipped once the cell has been closed.
+    # counters, e.g. an AStarPlanner, gets its expansions attribute increased by the cells expanded.
+    blocked, penalty = search_grids(snake_body, walls, grid_width, grid_height)
+    neighbors = neighbor_table(grid_width, grid_height)
+    goal_x, goal_y = goal
+    goal_cell = goal_y * grid_width + goal_x
+
+    closed = bytearray(grid_width * grid_height)
+    best_f = [None] * (grid_width * grid_height)
+    open_list = [Node(start[1] * grid_width + start[0])]
+    expanded = 0
     if VERBOSE:
         print(f"Starting A* search from {start} to {goal}")
 
     while open_list:
         current_node = heapq.heappop(open_list)
-        closed_set.add(current_node.position)
+        cell = current_node.cell
+        if closed[cell]:
+            continue
+        closed[cell] = 1
+        expanded += 1
 
         # Check if we reached the goal
-        if current_node.position == goal_node.position:
+        if cell == goal_cell:
+            if counters is not None:
+                counters.expansions += expanded
             path = []
             while current_node is not None:
-                path.append(current_node.position)
+                path.append((current_node.cell % grid_width, current_node.cell // grid_width))
                 current_node = current_node.parent
             if VERBOSE:
                 print(f"Path found: {path[::-1]}")
             return path[::-1]  # Return reversed path
 
-        # Generate neighbors (UP, DOWN, LEFT, RIGHT)
-        neighbors = [
-            (current_node.position[0] + 0, current_node.position[1] - 1),  # UP
-            (current_node.position[0] + 0, current_node.position[1] + 1),  # DOWN
-            (current_node.position[0] - 1, current_node.position[1] + 0),  # LEFT
-            (current_node.position[0] + 1, current_node.position[1] + 0),  # RIGHT
-        ]
-
-        for next_position in neighbors:
-            x, y = next_position
-
-            # Check if within bounds
-            if x < 0 or x >= grid_width or y < 0 or y >= grid_height:
-                continue
-
-            # Check if on snake's body or a wall
-            if next_position in snake_body or next_position in walls:
+        g_cost = current_node.g_cost + 1
+        for neighbor in neighbors[cell]:
+            # Skip snake body, walls and cells already expanded
+            if blocked[neighbor] or closed[neighbor]:
                 continue
 
-            # Create neighbor node
-            neighbor = Node(next_position, current_node)
-            if neighbor.position in closed_set:
-                continue
-
-            # Calculate costs
-            neighbor.g_cost = current_node.g_cost + 1
-            
-            # Heuristic: Manhattan distance to the goal
-            manhattan_distance = abs(neighbor.position[0] - goal_node.position[0]) + abs(neighbor.position[1] - goal_node.position[1])
-
-            # Additional heuristic: Penalize proximity to the snake's body
-            body_penalty = sum(1 for segment in snake_body if abs(segment[0] - neighbor.position[0]) + abs(segment[1] - neighbor.position[1]) <= 1)
+            # Heuristic: Manhattan distance to the goal plus a penalty for hugging the snake's body
+            manhattan_distance = abs(neighbor % grid_width - goal_x) + abs(neighbor // grid_width - goal_y)
+            f_cost = g_cost + manhattan_distance + penalty[neighbor]
 
-            # Total heuristic cost
-            neighbor.h_cost = manhattan_distance + body_penalty
-            neighbor.f_cost = neighbor.g_cost + neighbor.h_cost
-
-            # Check if neighbor is in open list with a lower f_cost
-            if any(open_node.position == neighbor.position and open_node.f_cost <= neighbor.f_cost for open_node in open_list):
+            # Skip if this cell is already in the open list with a lower or equal f_cost
+            known_f = best_f[neighbor]
+            if known_f is not None and known_f <= f_cost:
                 continue
+            best_f[neighbor] = f_cost
 
-            heapq.heappush(open_list, neighbor)
+            heapq.heappush(open_list, Node(neighbor, current_node, g_cost, f_cost))
 
+    if counters is not None:
+        counters.expansions += expanded
     if VERBOSE:
         print("No path found")
     return []  # Return empty path if no path is found
 
-def a_star_move(snake, food, board):
-
-    # Adjust start and goal to align with the grid
-    start = (snake.head_position()[0] // TILE_SIZE, snake.head_position()[1] // TILE_SIZE)
-    goal = (food.position[0] // TILE_SIZE, food.position[1] // TILE_SIZE)
+class AStarPlanner:
+    # Keeps the last A* path and follows it while it stays valid: same food, head still on the
+    # path and no cell ahead of the head blocked. A new search only runs when one of those breaks.
+    def __init__(self):
+        self.path = []  # Grid cells from the head at planning time to the food
+        self.step = 0  # Index of the head's current cell within path
+
+        # Totals across games, for profiling
+        self.searches = 0
+        self.expansions = 0
+        self.flood_fills = 0
+
+    def reset(self):
+        self.path = []
+        self.step = 0
+
+    def is_valid(self, head, goal, snake, walls):
+        if len(self.path) < 2 or self.path[-1] != goal:
+            return False
+        if self.step + 1 >= len(self.path) or self.path[self.step] != head:
+            return False
+
+        # The cells still ahead must be free of walls and snake
+        for x, y in self.path[self.step + 1:]:
+            if (x, y) in walls or snake.occupies((x, y)):
+                return False
+        return True
+
+    def next_position(self, snake, food, board):
+        # Next grid cell towards the food, or None if the food cannot be reached
+        start = snake.head_position()
+        goal = food.position
+        walls = board.walls
+
+        if not self.is_valid(start, goal, snake, walls):
+            self.path = a_star_search(start, goal, snake.body, board.width, board.height, walls, self)
+            self.step = 0
+            self.searches += 1
+            if len(self.path) < 2:
+                return None
+
+        self.step += 1
+        return self.path[self.step]
+
+def a_star_move(snake, food, board, planner=None):
+    a_star_steer(snake, food, board, planner)
 
-    grid_width = board.grid_width
-    grid_height = board.grid_height
-
-    # Convert snake body positions to grid coordinates
-    snake_body = [(segment[0] // TILE_SIZE, segment[1] // TILE_SIZE) for segment in snake.body]
+    # Move the snake
+    snake.move()
 
-    # Convert walls to grid coordinates
-    walls = {(x // TILE_SIZE, y // TILE_SIZE) for x, y in board.walls}
+def a_star_steer(snake, food, board, planner=None):
+    # Point the snake towards the food, or towards the most open space if there is no path.
+    # Without a planner every call runs a fresh search.
+    if planner is None:
+        planner = AStarPlanner()
 
-    path = a_star_search(start, goal, snake_body, grid_width, grid_height, walls)
+    next_position = planner.next_position(snake, food, board)
 
-    if len(path) > 1:
-        next_position = path[1]
+    if next_position is not None:
         head_x, head_y = snake.head_position()
-        next_x, next_y = next_position[0] * TILE_SIZE, next_position[1] * TILE_SIZE  # Convert back to pixel coordinates
+        next_x, next_y = next_position
 
         if next_y < head_y:
             snake.change_direction("UP")
@@ -119,53 +166,42 @@ def a_star_move(snake, food, board):
     else:
         # No path found, try to move randomly to stay alive
         stay_alive(snake, board)
-
-    # Move the snake
-    snake.move()
+        planner.flood_fills += 1
 
 def stay_alive(snake, board):
     #Attempt to keep the snake alive by prioritizing moves that maximize reachable space.
-    possible_moves = [
-        ((0, -1), "UP"),
-        ((0, 1), "DOWN"),
-        ((-1, 0), "LEFT"),
-        ((1, 0), "RIGHT")
-    ]
-
     head_x, head_y = snake.head_position()
-    snake_body = [(segment[0] // TILE_SIZE, segment[1] // TILE_SIZE) for segment in snake.body]
-    walls = {(x // TILE_SIZE, y // TILE_SIZE) for x, y in board.walls}
-
-    safe_moves = []
+    tail_x, tail_y = snake.body[-1]
 
-    # Evaluate moves and prioritize those that maximize open space
-    for move, direction in possible_moves:
-        next_x = (head_x // TILE_SIZE) + move[0]
-        next_y = (head_y // TILE_SIZE) + move[1]
+    # Label the free regions once, then every candidate move is a lookup
+    regions = Reachability(
+        blocked_grid(snake.body, board.walls, board.width, board.height),
+        board.width,
+        board.height,
+    )
 
-        # Check if within bounds and not colliding with itself or walls
-        if 0 <= next_x < board.grid_width and 0 <= next_y < board.grid_height:
-            if (next_x, next_y) not in snake_body and (next_x, next_y) not in walls:
-                # Calculate open space for this move
-                reachable_space = flood_fill(next_x, next_y, snake_body, walls, board.grid_width, board.grid_height)
-                safe_moves.append((direction, reachable_space))
+    # Moves into the snake, a wall or off the board have no reachable space
+    safe_moves = []
+    for direction, area in regions.move_areas(head_x, head_y):
+        if area > 0:
+            dx, dy = DIRECTION_OFFSETS[direction]
+            reaches_tail = regions.reaches(head_x + dx, head_y + dy, tail_x, tail_y)
+            safe_moves.append((direction, area, reaches_tail))
 
-    # Prioritize moves with the most reachable space
+    # Prioritize moves with the most reachable space, on a tie prefer a region the tail will open up
     if safe_moves:
-        best_move = max(safe_moves, key=lambda x: x[1])  # Pick the move with the highest reachable space
+        best_move = max(safe_moves, key=lambda x: (x[1], x[2]))
         snake.change_direction(best_move[0])
 
-            
 def flood_fill(x, y, snake_body, walls, grid_width, grid_height):
-    visited = set()
-    queue = [(x, y)]
+    # Reachable space from a single cell, stay_alive uses Reachability to answer all moves at once
+    snake_body = set(snake_body)
+    visited = {(x, y)}
+    queue = deque([(x, y)])
     reachable_space = 0
 
     while queue:
-        current_x, current_y = queue.pop(0)
-        if (current_x, current_y) in visited:
-            continue
-        visited.add((current_x, current_y))
+        current_x, current_y = queue.popleft()
 
         # Check if out of bounds, colliding with the snake's body, or colliding with walls
         if current_x < 0 or current_x >= grid_width or current_y < 0 or current_y >= grid_height:
@@ -184,6 +220,7 @@ def flood_fill(x, y, snake_body, walls, grid_width, grid_height):
         ]
         for neighbor in neighbors:
             if neighbor not in visited:
+                visited.add(neighbor)
                 queue.append(neighbor)
 
     return reachable_space
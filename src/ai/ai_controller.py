@@ -13,12 +13,14 @@ def select_mode(window):
         normal_text = font.render("1. Normal Mode", True, COLOR_TEXT)
         a_star_text = font.render("2. A* Mode", True, COLOR_TEXT)
         learning_text = font.render("3. Learning Mode", True, COLOR_TEXT)
+        hamiltonian_text = font.render("4. Hamiltonian Mode", True, COLOR_TEXT)
 
         # Display options
         window.blit(title_text, (WIDTH // 2, HEIGHT // 2 - 100))
         window.blit(normal_text, (WIDTH // 2, HEIGHT // 2 - 50))
         window.blit(a_star_text, (WIDTH // 2, HEIGHT // 2))
         window.blit(learning_text, (WIDTH // 2, HEIGHT // 2 + 50))
+        window.blit(hamiltonian_text, (WIDTH // 2, HEIGHT // 2 + 100))
 
         pygame.display.flip()
 
@@ -37,5 +39,8 @@ def select_mode(window):
                 elif event.key == pygame.K_3:
                     selected_mode = LEARNING_MODE
                     print("Learning model mode selected")
+                elif event.key == pygame.K_4:
+                    selected_mode = HAMILTONIAN_MODE
+                    print("Hamiltonian cycle mode selected")
 
     return selected_mode
\ No newline at end of file
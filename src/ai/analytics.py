@@ -0,0 +1,206 @@
+import itertools
+import json
+
+import numpy as np
+
+from src.game.run_store import iter_runs
+
+# Streaming statistics over run histories. Runs are read in fixed-size chunks, every chunk is
+# processed with vectorized numpy operations and only a bounded summary is kept, so the cost is
+# O(n) in time and O(window + buckets + chunk) in memory however long the history grows.
+
+CHUNK_SIZE = 65536  # Runs per chunk for legacy JSON files and in-memory scores
+CHUNK_BYTES = 1 << 22  # Bytes read per chunk from JSON Lines stores
+NUM_BUCKETS = 1000  # Plot resolution, between NUM_BUCKETS and 2 * NUM_BUCKETS points are kept
+Z_95 = 1.96  # Normal approximation for 95% confidence intervals
+
+# Translation table keeping digits and minus signs and blanking every other byte
+NUMBER_BYTES = bytes(byte if chr(byte) in "0123456789-" else ord(" ") for byte in range(256))
+
+def parse_lines(block, filename=""):
+    # (runs, scores) arrays of the complete JSON lines in block. Lines as RunStore writes them,
+    # {"run": N, "score": M}, are parsed all at once by blanking everything but the numbers;
+    # a block with any other line falls back to json, skipping malformed lines.
+    lines = block.count(b"\n")
+    values = np.fromstring(block.translate(NUMBER_BYTES), dtype=np.int64, sep=" ")
+    if len(values) == 2 * lines and block.count(b'{"run": ') == lines and block.count(b', "score": ') == lines:
+        return values[0::2].astype(np.float64), values[1::2].astype(np.float64)
+
+    runs, scores = [], []
+    for line in block.splitlines():
+        try:
+            record = json.loads(line)
+            runs.append(record["run"])
+            scores.append(record["score"])
+        except (json.JSONDecodeError, KeyError, TypeError):
+            print(f"Skipping malformed line in {filename}.")
+    return np.array(runs, dtype=np.float64), np.array(scores, dtype=np.float64)
+
+def score_chunks(filename, chunk_size=CHUNK_SIZE):
+    # (runs, scores) arrays a chunk at a time from a JSON Lines store or a legacy JSON file
+    if not filename.endswith(".jsonl"):
+        records = iter_runs(filename)
+        while True:
+            chunk = list(itertools.islice(records, chunk_size))
+            if not chunk:
+                return
+            runs = np.fromiter((record["run"] for record in chunk), dtype=np.float64, count=len(chunk))
+            scores = np.fromiter((record["score"] for record in chunk), dtype=np.float64, count=len(chunk))
+            yield runs, scores
+
+    try:
+        file = open(filename, "rb")
+    except FileNotFoundError:
+        return
+    with file:
+        rest = b""
+        while True:
+            block = file.read(CHUNK_BYTES)
+            if not block:
+                break
+            block = rest + block
+            end = block.rfind(b"\n") + 1  # A line cut by the block boundary waits for the next block
+            rest = block[end:]
+            if end:
+                yield parse_lines(block[:end], filename)
+        if rest.strip():
+            # Last line without a newline, e.g. left by a crash mid-write
+            yield parse_lines(rest + b"\n", filename)
+
+class RollingStats:
+    # Rolling mean, sample standard deviation and 95% CI over the last window values of a stream.
+    # Each update uses prefix sums over the new chunk plus the last window - 1 values carried
+    # from the previous one. The first window - 1 values use every value seen so far.
+    def __init__(self, window):
+        self.window = window
+        self.carry = np.empty(0)
+        self.shift = None  # Subtracted before summing squares, keeps the variance numerically stable
+
+    def update(self, values):
+        # Returns (mean, std, ci_lower, ci_upper) arrays, one entry per value in values
+        values = np.asarray(values, dtype=np.float64)
+        if self.shift is None and len(values):
+            self.shift = values[0]
+        data = np.concatenate([self.carry, values]) - (self.shift or 0.0)
+
+        sums = np.concatenate([[0.0], np.cumsum(data)])
+        squares = np.concatenate([[0.0], np.cumsum(data * data)])
+        ends = np.arange(len(self.carry) + 1, len(data) + 1)
+        starts = np.maximum(ends - self.window, 0)
+        counts = ends - starts
+
+        window_sums = sums[ends] - sums[starts]
+        mean = window_sums / counts
+        deviations = np.maximum(squares[ends] - squares[starts] - window_sums * mean, 0.0)
+        std = np.sqrt(deviations / np.maximum(counts - 1, 1))
+        half_width = Z_95 * std / np.sqrt(counts)
+
+        keep = min(self.window - 1, len(data))
+        self.carry = data[len(data) - keep:] + (self.shift or 0.0)
+        mean += self.shift or 0.0
+        return mean, std, mean - half_width, mean + half_width
+
+class Downsampler:
+    # Min, max and mean per bucket of consecutive rows, for series passed as the columns of a 2D
+    # chunk. Buckets start one row wide; once there are 2 * num_buckets of them, neighbours are
+    # merged and the width doubles, so the number kept stays bounded without knowing the total.
+    def __init__(self, num_columns, num_buckets=NUM_BUCKETS):
+        self.num_buckets = num_buckets
+        self.width = 1
+        self.mins = np.empty((0, num_columns))
+        self.maxs = np.empty((0, num_columns))
+        self.sums = np.empty((0, num_columns))
+        self.counts = np.empty(0)
+        # Rows of the last, partially filled bucket, fewer than width
+        self.pending = np.empty((0, num_columns))
+
+    def update(self, rows):
+        rows = np.concatenate([self.pending, np.asarray(rows, dtype=np.float64)])
+        full = len(rows) // self.width * self.width
+        if full:
+            buckets = rows[:full].reshape(-1, self.width, rows.shape[1])
+            self.mins = np.concatenate([self.mins, buckets.min(axis=1)])
+            self.maxs = np.concatenate([self.maxs, buckets.max(axis=1)])
+            self.sums = np.concatenate([self.sums, buckets.sum(axis=1)])
+            self.counts = np.concatenate([self.counts, np.full(len(buckets), self.width)])
+        self.pending = rows[full:]
+
+        while len(self.counts) >= 2 * self.num_buckets:
+            self.merge()
+
+    def merge(self):
+        # Merge neighbouring bucket pairs, an odd last bucket is kept as it is
+        pairs = len(self.counts) // 2 * 2
+        self.mins = np.concatenate([np.minimum(self.mins[:pairs:2], self.mins[1:pairs:2]), self.mins[pairs:]])
+        self.maxs = np.concatenate([np.maximum(self.maxs[:pairs:2], self.maxs[1:pairs:2]), self.maxs[pairs:]])
+        self.sums = np.concatenate([self.sums[:pairs:2] + self.sums[1:pairs:2], self.sums[pairs:]])
+        self.counts = np.concatenate([self.counts[:pairs:2] + self.counts[1:pairs:2], self.counts[pairs:]])
+        self.width *= 2
+
+    def result(self):
+        # (mins, maxs, means) arrays with one row per bucket, the partial bucket included
+        mins, maxs, sums, counts = self.mins, self.maxs, self.sums, self.counts
+        if len(self.pending):
+            mins = np.concatenate([mins, self.pending.min(axis=0, keepdims=True)])
+            maxs = np.concatenate([maxs, self.pending.max(axis=0, keepdims=True)])
+            sums = np.concatenate([sums, self.pending.sum(axis=0, keepdims=True)])
+            counts = np.concatenate([counts, [len(self.pending)]])
+        return mins, maxs, sums / counts[:, None]
+
+def median_from_counts(counts):
+    # Median of non-negative integer values given how often each value occurs
+    total = counts.sum()
+    if not total:
+        return 0.0
+    cumulative = np.cumsum(counts)
+    lower = np.searchsorted(cumulative, (total + 1) // 2)
+    upper = np.searchsorted(cumulative, total // 2 + 1)
+    return (lower + upper) / 2
+
+def summarize_chunks(chunks, window=100, num_buckets=NUM_BUCKETS):
+    # One streaming pass over (runs, scores) chunks: downsampled scores and rolling statistics for
+    # plotting, plus the exact mean and median. Scores are integers, so the median comes from a
+    # count per score value rather than from keeping every score.
+    rolling = RollingStats(window)
+    downsampler = Downsampler(6, num_buckets)
+    score_counts = np.zeros(0, dtype=np.int64)
+    total = 0.0
+    num_runs = 0
+
+    for runs, scores in chunks:
+        mean, std, ci_lower, ci_upper = rolling.update(scores)
+        downsampler.update(np.column_stack([runs, scores, mean, std, ci_lower, ci_upper]))
+        chunk_counts = np.bincount(np.maximum(scores, 0).astype(np.int64))
+        if len(chunk_counts) > len(score_counts):
+            score_counts = np.pad(score_counts, (0, len(chunk_counts) - len(score_counts)))
+        score_counts[:len(chunk_counts)] += chunk_counts
+        total += scores.sum()
+        num_runs += len(scores)
+
+    mins, maxs, means = downsampler.result()
+    return {
+        "runs": num_runs,
+        "mean": total / num_runs if num_runs else 0.0,
+        "median": median_from_counts(score_counts),
+        "run": means[:, 0],
+        "score_min": mins[:, 1],
+        "score_max": maxs[:, 1],
+        "score_mean": means[:, 1],
+        "rolling_mean": means[:, 2],
+        "rolling_std": means[:, 3],
+        "ci_lower": means[:, 4],
+        "ci_upper": means[:, 5],
+    }
+
+def summarize_runs(filename, window=100, num_buckets=NUM_BUCKETS, chunk_size=CHUNK_SIZE):
+    # Summary of a run history file, see summarize_chunks
+    return summarize_chunks(score_chunks(filename, chunk_size), window, num_buckets)
+
+def summarize_scores(scores, window=100, num_buckets=NUM_BUCKETS, chunk_size=CHUNK_SIZE):
+    # Summary of an in-memory score list, runs are numbered from 0
+    scores = np.asarray(scores, dtype=np.float64)
+    chunks = (
+        (np.arange(start, min(start + chunk_size, len(scores)), dtype=np.float64), scores[start:start + chunk_size])
+        for start in range(0, len(scores), chunk_size)
+    )
+    return summarize_chunks(chunks, window, num_buckets)
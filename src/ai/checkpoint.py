@@ -0,0 +1,133 @@
+import glob
+import os
+import queue
+import threading
+import time
+
+import torch
+
+CHECKPOINT_DIR = "data/checkpoints"
+
+class CheckpointManager:
+    # Periodic full training checkpoints: both networks, Adam moments, epsilon, game counter and
+    # training scheduler counters and optionally the replay buffer. The training thread only takes a CPU copy of
+    # the state; torch.save, fsync and the atomic rename run on a background writer thread.
+    # A checkpoint is due every every_games games or every_seconds seconds, whichever comes
+    # first, and only the newest keep checkpoints stay on disk. Age is judged by when a checkpoint
+    # was taken, not by its game count, which restarts at 0 when a run keeps a newer model.pth.
+    # A session ending with fewer than min_final_games games since the last checkpoint leaves
+    # its weights in model.pth only.
+    def __init__(self, directory=CHECKPOINT_DIR, every_games=500, every_seconds=600, keep=3, include_replay=False,
+                 min_final_games=50):
+        self.directory = directory
+        self.every_games = every_games
+        self.every_seconds = every_seconds
+        self.keep = keep
+        self.min_final_games = min_final_games
+        self.include_replay = include_replay
+        self.last_games = None  # n_games at the last checkpoint, None until the first maybe_save
+        self.last_time = time.monotonic()
+        self.pending = queue.Queue()
+        self.thread = None
+
+    def path_for(self, n_games):
+        # Unique per save, the game count is only there for people browsing the directory
+        return os.path.join(self.directory, f"checkpoint-{time.time_ns()}-games{n_games}.pt")
+
+    def checkpoints(self):
+        # Checkpoint files, oldest first by modification time
+        paths = glob.glob(os.path.join(self.directory, "checkpoint-*.pt"))
+        return sorted(paths, key=lambda path: (os.path.getmtime(path), path))
+
+    def latest(self):
+        checkpoints = self.checkpoints()
+        return checkpoints[-1] if checkpoints else None
+
+    def maybe_save(self, learning_model):
+        # Call once per finished game, returns True if a checkpoint was queued
+        if self.last_games is None:
+            self.last_games = learning_model.n_games
+        games_due = self.every_games and learning_model.n_games - self.last_games >= self.every_games
+        time_due = self.every_seconds and time.monotonic() - self.last_time >= self.every_seconds
+        if games_due or time_due:
+            self.save(learning_model)
+            return True
+        return False
+
+    def save_final(self, learning_model):
+        # Call when a training session ends, returns True if a checkpoint was queued
+        if self.last_games is None or learning_model.n_games - self.last_games < self.min_final_games:
+            return False
+        self.save(learning_model)
+        return True
+
+    def save(self, learning_model):
+        state = learning_model.training_state(include_replay=self.include_replay)
+        path = self.path_for(learning_model.n_games)  # Named when taken, so queued saves keep their order
+        self.last_games = learning_model.n_games
+        self.last_time = time.monotonic()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.write_loop, name="checkpoint-writer", daemon=True)
+            self.thread.start()
+        self.pending.put((path, state))
+
+    def write_loop(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            self.write(*item)
+
+    def write(self, path, state):
+        temp_path = path + ".tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, "wb") as file:
+                torch.save(state, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, path)
+            print(f"Checkpoint saved to {path}.")
+        except OSError as e:
+            print(f"Error saving checkpoint {path}: {e}")
+            return
+
+        for old_path in self.checkpoints()[:-self.keep] if self.keep else []:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def close(self):
+        # Wait for queued checkpoints to reach the disk
+        if self.thread is not None:
+            self.pending.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def resume(self, learning_model, model_path="model.pth"):
+        # Load the newest checkpoint unless model_path holds newer weights, e.g. from a run
+        # without checkpoints, in which case the plain model loaded from it is kept
+        path = self.latest()
+        if path is None:
+            return False
+        if os.path.exists(model_path) and os.path.getmtime(model_path) > os.path.getmtime(path):
+            print(f"{model_path} is newer than {path}, keeping its weights.")
+            return False
+        return self.load(learning_model, path)
+
+    def load(self, learning_model, path=None):
+        # Resume from a checkpoint, the newest one by default. Returns True if one was loaded.
+        path = path or self.latest()
+        if path is None:
+            return False
+        try:
+            # Tensors stay on the CPU, load_state_dict moves them to the model's device
+            state = torch.load(path, map_location="cpu", weights_only=True)
+        except Exception as e:
+            print(f"Could not load checkpoint {path}: {e}")
+            return False
+        learning_model.load_training_state(state)
+        self.last_games = learning_model.n_games
+        print(f"Resumed from {path}: {learning_model.n_games} games, epsilon {learning_model.epsilon:.4f}.")
+        return True
@@ -0,0 +1,159 @@
+import queue
+import time
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+from src.ai.checkpoint import CheckpointManager
+from src.ai.inference import PolicyInference
+from src.ai.learning import ACTION_SIZE, HIDDEN_SIZE, STATE_SIZE, DeepQLearningModel, DeepQNetwork
+from src.game.batch_engine import BatchGameEngine
+
+def actor_epsilons(num_actors, base=0.4, spread=7):
+    # Fixed exploration rate per actor, from mostly random to nearly greedy
+    if num_actors == 1:
+        return [base]
+    return [base ** (1 + spread * i / (num_actors - 1)) for i in range(num_actors)]
+
+def run_actor(actor_id, shared_model, weights_lock, weights_version, transitions, stop,
+              num_envs, epsilon, chunk_steps, seed):
+    # Actor process: plays num_envs headless games with a local copy of the network and
+    # streams transitions to the learner in chunks of chunk_steps ticks.
+    torch.set_num_threads(1)
+    model = DeepQNetwork(STATE_SIZE, HIDDEN_SIZE, ACTION_SIZE)
+    with weights_lock:
+        model.load_state_dict(shared_model.state_dict())
+        version = weights_version.value
+    model.eval()
+    policy = PolicyInference(model)  # Views of the local weights, refreshed by load_state_dict
+
+    env = BatchGameEngine(num_envs, seed=seed)
+    rng = np.random.default_rng(seed)
+    states = env.observe()
+    chunk = []
+
+    while not stop.is_set():
+        # Pick up weights broadcast by the learner
+        if weights_version.value != version:
+            with weights_lock:
+                model.load_state_dict(shared_model.state_dict())
+                version = weights_version.value
+
+        actions = policy.best_actions(states)
+        explore = rng.random(num_envs) < epsilon
+        actions[explore] = rng.integers(0, ACTION_SIZE, explore.sum())
+
+        next_states, rewards, dones = env.step(actions)
+        chunk.append((states, actions, rewards, next_states, dones, env.last_scores[dones]))
+        states = env.observe()
+
+        if len(chunk) >= chunk_steps:
+            batch = tuple(np.concatenate(parts) for parts in zip(*chunk))
+            chunk = []
+            # Block while the learner is behind, but keep checking for shutdown
+            while not stop.is_set():
+                try:
+                    transitions.put((actor_id, batch), timeout=0.5)
+                    break
+                except queue.Full:
+                    pass
+
+def train_distributed(num_actors=4, envs_per_actor=16, max_games=10000, chunk_steps=32,
+                      sync_interval=2000, learning_rate=0.002, gamma=0.9, batch_size=1000,
+                      train_interval=4, gradient_steps=1, target_sync="hard", target_update_interval=1000,
+                      tau=0.005, model_path="model.pth", seed=0, checkpoint_dir="data/checkpoints",
+                      checkpoint_games=500, checkpoint_seconds=600):
+    # Central learner: owns the optimizer and replay buffer, trains on transitions streamed by
+    # num_actors actor processes and broadcasts weights back every sync_interval env steps.
+    learning_model = DeepQLearningModel(
+        state_space_size=STATE_SIZE,
+        action_space_size=ACTION_SIZE,
+        learning_rate=learning_rate,
+        gamma=gamma,
+        batch_size=batch_size,
+        train_interval=train_interval,
+        gradient_steps=gradient_steps,
+        target_sync=target_sync,
+        target_update_interval=target_update_interval,
+        tau=tau,
+    )
+    learning_model.load_model(model_path)
+    checkpoints = CheckpointManager(checkpoint_dir, every_games=checkpoint_games, every_seconds=checkpoint_seconds)
+    checkpoints.resume(learning_model, model_path)
+    learning_model.model.train()
+
+    context = mp.get_context("spawn")
+    shared_model = DeepQNetwork(STATE_SIZE, HIDDEN_SIZE, ACTION_SIZE)
+    shared_model.load_state_dict(learning_model.model.state_dict())
+    shared_model.share_memory()
+    weights_lock = context.Lock()
+    weights_version = context.Value("i", 0)
+    transitions = context.Queue(maxsize=4 * num_actors)
+    stop = context.Event()
+
+    actors = []
+    for actor_id, epsilon in enumerate(actor_epsilons(num_actors)):
+        actor = context.Process(
+            target=run_actor,
+            args=(actor_id, shared_model, weights_lock, weights_version, transitions, stop,
+                  envs_per_actor, epsilon, chunk_steps, seed + actor_id),
+            daemon=True,
+        )
+        actor.start()
+        actors.append(actor)
+    print(f"Started {num_actors} actors with {envs_per_actor} games each.")
+
+    scores = []
+    steps_since_sync = 0
+    start_time = time.time()
+
+    try:
+        while len(scores) < max_games:
+            try:
+                _, (states, actions, rewards, next_states, dones, finished) = transitions.get(timeout=10)
+            except queue.Empty:
+                if not any(actor.is_alive() for actor in actors):
+                    print("All actors stopped unexpectedly.")
+                    break
+                continue
+
+            learning_model.memory.push_batch(states, actions, rewards, next_states, dones)
+            steps_since_sync += len(actions)
+
+            # Same scheduler as single-process training, so the env-steps-per-update ratio matches
+            learning_model.train_on_schedule(len(actions))
+
+            if len(finished):
+                scores.extend(finished.tolist())
+                learning_model.n_games += len(finished)
+                checkpoints.maybe_save(learning_model)
+                if len(scores) // 100 != (len(scores) - len(finished)) // 100:
+                    recent = scores[-100:]
+                    rates = learning_model.scheduler.rates()
+                    print(f"[DISTRIBUTED] Games: {len(scores)}, Mean (last 100): {sum(recent) / len(recent):.2f}, "
+                          f"Best: {max(scores)}, Steps/sec: {rates['steps_per_second']:.0f}, "
+                          f"Updates/sec: {rates['updates_per_second']:.1f}, "
+                          f"Samples/sec: {rates['samples_per_second']:.0f}")
+
+            if steps_since_sync >= sync_interval:
+                with weights_lock:
+                    shared_model.load_state_dict(learning_model.model.state_dict())
+                    weights_version.value += 1
+                steps_since_sync = 0
+    finally:
+        stop.set()
+        # Drain so actors blocked on a full queue can exit
+        while any(actor.is_alive() for actor in actors):
+            try:
+                transitions.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            for actor in actors:
+                actor.join(timeout=0.1)
+        learning_model.save_model(model_path)
+        checkpoints.save(learning_model)
+        checkpoints.close()
+
+    print(f"[DISTRIBUTED] Completed {len(scores)} games in {time.time() - start_time:.1f}s.")
+    return scores
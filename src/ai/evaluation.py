@@ -0,0 +1,149 @@
+import argparse
+import math
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+import torch
+
+from src.ai.a_star import AStarPlanner, a_star_steer
+from src.ai.features import FeatureExtractor
+from src.ai.hamiltonian import HamiltonianPlanner, hamiltonian_steer
+from src.ai.inference import PolicyInference
+from src.ai.learning import ACTION_SIZE, HIDDEN_SIZE, STATE_SIZE, DeepQNetwork
+from src.game.engine import GameEngine
+
+DIRECTIONS = ["UP", "DOWN", "LEFT", "RIGHT"]
+CONTROLLERS = ("dqn", "a_star", "hamiltonian")
+
+_policy = None  # Greedy DQN policy of a worker process, loaded once by init_worker
+
+def game_seed(seed, index):
+    # Distinct, reproducible seed for game index of an evaluation started with seed
+    return (seed << 32) | index
+
+def load_policy(model_path):
+    model = DeepQNetwork(STATE_SIZE, HIDDEN_SIZE, ACTION_SIZE)
+    model.load_state_dict(torch.load(model_path, map_location=torch.device("cpu")))
+    model.eval()
+    return PolicyInference(model)
+
+def init_worker(controller, model_path):
+    global _policy
+    torch.set_num_threads(1)
+    if controller == "dqn":
+        _policy = load_policy(model_path)
+
+def play_game(controller, seed, num_walls=0, max_idle_ticks=2000, policy=None):
+    # One headless game, returns (score, ticks). Walls and food come from the game's own seeded
+    # generator and both controllers are deterministic, so the same seed replays the same game.
+    # The idle limit counts ticks since the last food, so long games are not cut short.
+    policy = policy or _policy
+    engine = GameEngine(num_walls=num_walls, max_idle_ticks=max_idle_ticks, seed=seed)
+    planner = AStarPlanner()
+    cycle_planner = HamiltonianPlanner()
+    features = FeatureExtractor()
+    ticks = 0
+
+    while not engine.tick():
+        ticks += 1
+        direction = None
+        if controller == "a_star":
+            a_star_steer(engine.snake, engine.food, engine.board, planner)
+        elif controller == "hamiltonian":
+            hamiltonian_steer(engine.snake, engine.food, engine.board, cycle_planner,
+                              fallback=lambda snake, food, board: a_star_steer(snake, food, board, planner))
+        else:
+            state = features.state(engine.snake, engine.food, engine.board)
+            direction = DIRECTIONS[policy.best_action(state)]
+            features.invalidate()
+
+        engine.move(direction)
+        if engine.resolve():
+            engine.idle_timer = 0
+            if engine.food.position is None:
+                break  # The snake fills the board
+        if engine.done:
+            break
+
+    return engine.score, ticks
+
+def play_games(args):
+    controller, seeds, num_walls, max_idle_ticks = args
+    return [play_game(controller, seed, num_walls, max_idle_ticks) for seed in seeds]
+
+def summarize(values):
+    values = np.asarray(values, dtype=float)
+    count = len(values)
+    std = values.std(ddof=1) if count > 1 else 0.0
+    half_width = 1.96 * std / math.sqrt(count) if count > 1 else 0.0  # Normal approximation
+    return {
+        "mean": float(values.mean()),
+        "median": float(np.median(values)),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "std": float(std),
+        "ci95": [float(values.mean() - half_width), float(values.mean() + half_width)],
+    }
+
+def evaluate(controller="dqn", num_games=1000, num_walls=0, seed=0, processes=None,
+             model_path="model.pth", max_idle_ticks=2000):
+    # Play num_games seeded games over a process pool and aggregate scores and episode lengths
+    if controller not in CONTROLLERS:
+        raise ValueError(f"Unknown controller {controller!r}, expected one of {CONTROLLERS}.")
+    if controller == "dqn" and not os.path.exists(model_path):
+        raise FileNotFoundError(f"No saved model found at {model_path}.")
+
+    processes = processes or os.cpu_count() or 1
+    seeds = [game_seed(seed, index) for index in range(num_games)]
+    chunk_size = max(1, math.ceil(num_games / (processes * 8)))  # Small chunks balance uneven game lengths
+    chunks = [
+        (controller, seeds[start:start + chunk_size], num_walls, max_idle_ticks)
+        for start in range(0, num_games, chunk_size)
+    ]
+
+    start_time = time.time()
+    if processes == 1:
+        init_worker(controller, model_path)
+        results = [result for chunk in chunks for result in play_games(chunk)]
+    else:
+        context = mp.get_context("spawn")
+        with context.Pool(processes, initializer=init_worker, initargs=(controller, model_path)) as pool:
+            results = [result for chunk_results in pool.map(play_games, chunks) for result in chunk_results]
+    elapsed = time.time() - start_time
+
+    scores = [score for score, _ in results]
+    lengths = [ticks for _, ticks in results]
+    return {
+        "controller": controller,
+        "games": num_games,
+        "seed": seed,
+        "num_walls": num_walls,
+        "seconds": round(elapsed, 2),
+        "score": summarize(scores),
+        "episode_length": summarize(lengths),
+        "scores": scores,
+        "episode_lengths": lengths,
+    }
+
+def print_summary(summary):
+    score, length = summary["score"], summary["episode_length"]
+    print(f"[EVALUATION] {summary['controller']}: {summary['games']} games in {summary['seconds']:.1f}s")
+    print(f"  Score  mean {score['mean']:.2f} (95% CI {score['ci95'][0]:.2f}-{score['ci95'][1]:.2f}), "
+          f"median {score['median']:.1f}, max {score['max']:.0f}")
+    print(f"  Length mean {length['mean']:.0f}, median {length['median']:.0f}, max {length['max']:.0f} ticks")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate a controller on seeded headless games.")
+    parser.add_argument("controller", choices=CONTROLLERS)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--walls", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--model", default="model.pth")
+    parser.add_argument("--max-idle-ticks", type=int, default=2000)
+    args = parser.parse_args()
+
+    print_summary(evaluate(args.controller, args.games, args.walls, args.seed, args.processes,
+                           args.model, args.max_idle_ticks))
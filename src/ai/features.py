@@ -0,0 +1,86 @@
+import numpy as np
+
+STATE_SIZE = 11
+EMPTY_STATE = bytes(STATE_SIZE)
+DIRECTION_INDEX = {"UP": 0, "DOWN": 1, "LEFT": 2, "RIGHT": 3}
+DIRECTION_OFFSETS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+LEFT_OF = (2, 3, 1, 0)
+RIGHT_OF = (3, 2, 0, 1)
+
+class FeatureExtractor:
+    # Same 11 features as DeepQLearningModel.get_state, written into reused uint8 buffers.
+    # Features are set through bytearrays that the NumPy buffers view, which avoids the
+    # per-element overhead of NumPy scalar assignment.
+    # after_move() computes the next state and the get_reward value from one set of collision
+    # lookups, and its next state is reused as the following current state until invalidate()
+    # is called (food eaten, game over or reset), so a learning tick extracts features once.
+    def __init__(self):
+        self.raw = (bytearray(STATE_SIZE), bytearray(STATE_SIZE))
+        self.buffers = tuple(np.frombuffer(raw, dtype=np.uint8) for raw in self.raw)
+        self.slot = 0  # Buffers alternate so a transition's state and next state never alias
+        self.current = None
+
+    def invalidate(self):
+        self.current = None
+
+    def state(self, snake, food, board):
+        # Features of the current position, reusing the last next state while it is still valid
+        if self.current is None:
+            self.current, _, _ = self.extract(snake, food, board)
+        return self.current
+
+    def after_move(self, snake, food, board):
+        # (next_state, reward) right after the snake moved, before food and collisions are resolved
+        next_state, straight, straight_in_bounds = self.extract(snake, food, board)
+        self.current = next_state
+
+        head_x, head_y = snake.head_position()
+        fruit_x, fruit_y = food.position
+        next_head_x, next_head_y = straight
+
+        dist_to_food_before = abs(head_x - fruit_x) + abs(head_y - fruit_y)
+        dist_to_food_after = abs(next_head_x - fruit_x) + abs(next_head_y - fruit_y)
+        head_collision = snake.occupied[(head_x, head_y)] > 1 or (head_x, head_y) in board.walls
+
+        if not straight_in_bounds or head_collision:
+            reward = -10  # Large penalty for dying
+        elif straight == food.position:
+            reward = 20  # Large reward for eating food
+        elif dist_to_food_after < dist_to_food_before:
+            reward = 2  # Small reward for getting closer to food
+        else:
+            reward = -1  # Small penalty for moving farther away
+        return next_state, reward
+
+    def extract(self, snake, food, board):
+        # Fill the next buffer, also returns the cell straight ahead and whether it is on the board
+        buffer, raw = self.buffers[self.slot], self.raw[self.slot]
+        self.slot ^= 1
+        raw[:] = EMPTY_STATE
+
+        head_x, head_y = snake.head_position()
+        fruit_x, fruit_y = food.position
+        straight = (head_x, head_y)
+        straight_in_bounds = board.is_within_bounds(straight)
+
+        direction = DIRECTION_INDEX.get(snake.direction)
+        if direction is not None:
+            # Danger straight, left and right
+            for column, turn in ((0, direction), (1, LEFT_OF[direction]), (2, RIGHT_OF[direction])):
+                dx, dy = DIRECTION_OFFSETS[turn]
+                cell = (head_x + dx, head_y + dy)
+                in_bounds = 0 <= cell[0] < board.width and 0 <= cell[1] < board.height
+                if not in_bounds or cell in snake.occupied or cell in board.walls:
+                    raw[column] = 1
+                if column == 0:
+                    straight, straight_in_bounds = cell, in_bounds
+
+            # Current movement direction
+            raw[3 + direction] = 1
+
+        # Food relative position
+        raw[7] = fruit_x < head_x
+        raw[8] = fruit_x > head_x
+        raw[9] = fruit_y < head_y
+        raw[10] = fruit_y > head_y
+        return buffer, straight, straight_in_bounds
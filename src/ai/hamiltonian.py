@@ -0,0 +1,243 @@
+from collections import OrderedDict, deque
+
+from src.ai.reachability import neighbor_table
+
+DIRECTION_OFFSETS = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+OPPOSITE = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
+SHORTCUT_MARGIN = 3  # Free cells kept between the new head and the tail when taking a shortcut
+SHORTCUT_MAX_FILL = 0.5  # No shortcuts once the snake covers this fraction of the cycle
+CACHE_SIZE = 32  # Board layouts whose cycles are kept in memory
+
+def open_cycle(width, height):
+    # Hamiltonian cycle of a wall-free board as flat cells, None if both sides are odd.
+    # Runs along the top row, snakes back and forth through the other columns row by row
+    # and returns up column 0. Needs an even height, an even width is handled by transposing.
+    if width < 2 or height < 2:
+        return None
+    if height % 2:
+        if width % 2:
+            return None
+        return [(cell % height) * width + cell // height for cell in open_cycle(height, width)]
+
+    cells = [(x, 0) for x in range(width)]
+    for y in range(1, height):
+        columns = range(width - 1, 0, -1) if y % 2 else range(1, width)
+        cells.extend((x, y) for x in columns)
+    cells.extend((0, y) for y in range(height - 1, 0, -1))
+    return [y * width + x for x, y in cells]
+
+def two_factor(cells, neighbors, dark):
+    # Every free cell linked to exactly two neighbors, i.e. disjoint cycles covering the board.
+    # The grid is bipartite, so this is a degree-2 matching between dark and light cells:
+    # greedy first, then augmenting paths for the dark cells still short of two links.
+    links = [set() for _ in neighbors]
+    for cell in dark:
+        for neighbor in neighbors[cell]:
+            if len(links[cell]) < 2 and len(links[neighbor]) < 2:
+                links[cell].add(neighbor)
+                links[neighbor].add(cell)
+
+    def augment(root):
+        # Breadth-first over alternating paths: dark -(unlinked)-> light -(linked)-> dark
+        parent = {root: None}
+        queue = deque([root])
+        while queue:
+            cell = queue.popleft()
+            for light in neighbors[cell]:
+                if light in links[cell] or light in parent:
+                    continue
+                parent[light] = cell
+                if len(links[light]) < 2:
+                    # Flip the path: link every unlinked pair on it and unlink every linked one
+                    while True:
+                        cell = parent[light]
+                        links[cell].add(light)
+                        links[light].add(cell)
+                        previous = parent[cell]
+                        if previous is None:
+                            return True
+                        links[cell].discard(previous)
+                        links[previous].discard(cell)
+                        light = previous
+                for linked in links[light]:
+                    if linked not in parent:
+                        parent[linked] = light
+                        queue.append(linked)
+        return False
+
+    for cell in dark:
+        while len(links[cell]) < 2:
+            if not augment(cell):
+                return None
+    return links
+
+def build_cycle(width, height, walls):
+    # Hamiltonian cycle through every free cell as flat cells, or None if none was found.
+    # Starts from a two-factor and merges neighboring cycles: where two cycles run along opposite
+    # sides of a unit square, swapping those two edges for the other two sides joins them.
+    free = bytearray(width * height)
+    for cell in range(width * height):
+        free[cell] = (cell % width, cell // width) not in walls
+    neighbors = [[n for n in cells if free[n]] for cells in neighbor_table(width, height)]
+    cells = [cell for cell in range(width * height) if free[cell]]
+
+    # A cycle on a grid alternates colors, so both colors need the same count
+    dark = [cell for cell in cells if (cell % width + cell // width) % 2]
+    if len(cells) < 4 or len(dark) * 2 != len(cells) or any(len(neighbors[cell]) < 2 for cell in cells):
+        return None
+
+    links = two_factor(cells, neighbors, dark)
+    if links is None:
+        return None
+
+    # Union-find over cells, one set per cycle
+    root = list(range(width * height))
+
+    def find(cell):
+        while root[cell] != cell:
+            root[cell] = root[root[cell]]
+            cell = root[cell]
+        return cell
+
+    for cell in cells:
+        for neighbor in links[cell]:
+            root[find(cell)] = find(neighbor)
+    cycles = len({find(cell) for cell in cells})
+
+    def swap(a, b, c, d):
+        # Replace edges a-b and c-d by a-c and b-d
+        links[a].discard(b)
+        links[b].discard(a)
+        links[c].discard(d)
+        links[d].discard(c)
+        links[a].add(c)
+        links[c].add(a)
+        links[b].add(d)
+        links[d].add(b)
+        root[find(a)] = find(c)
+
+    merged = True
+    while merged and cycles > 1:
+        merged = False
+        for y in range(height - 1):
+            for x in range(width - 1):
+                top_left = y * width + x
+                top_right, bottom_left, bottom_right = top_left + 1, top_left + width, top_left + width + 1
+                if not (free[top_left] and free[top_right] and free[bottom_left] and free[bottom_right]):
+                    continue
+                if find(top_left) == find(bottom_left) and find(top_left) == find(top_right):
+                    continue
+                if top_right in links[top_left] and bottom_right in links[bottom_left] and find(top_left) != find(bottom_left):
+                    swap(top_left, top_right, bottom_left, bottom_right)
+                elif bottom_left in links[top_left] and bottom_right in links[top_right] and find(top_left) != find(top_right):
+                    swap(top_left, bottom_left, top_right, bottom_right)
+                else:
+                    continue
+                cycles -= 1
+                merged = True
+    if cycles > 1:
+        return None
+
+    # Walk the single cycle
+    cycle = [cells[0]]
+    previous = None
+    while len(cycle) < len(cells):
+        following = next(n for n in links[cycle[-1]] if n != previous)
+        previous = cycle[-1]
+        cycle.append(following)
+    return cycle
+
+_cycles = OrderedDict()  # (width, height, walls) -> cycle or None, least recently used first
+
+def load_cycle(width, height, walls):
+    # Cycle for a board layout, built on first use and kept in an in-memory LRU cache.
+    # A layout without a cycle is cached as None so it is not searched again.
+    key = (width, height, frozenset(walls))
+    if key in _cycles:
+        _cycles.move_to_end(key)
+        return _cycles[key]
+
+    cycle = open_cycle(width, height) if not walls else build_cycle(width, height, walls)
+    _cycles[key] = cycle
+    if len(_cycles) > CACHE_SIZE:
+        _cycles.popitem(last=False)
+    return cycle
+
+class HamiltonianPlanner:
+    # Follows a precomputed Hamiltonian cycle, so every move is a table lookup. Invariant: the
+    # whole body lies on the stretch of cycle from the tail forward to the head. A shortcut to a
+    # neighbor further along the cycle keeps it as long as the neighbor is still before the tail
+    # (with SHORTCUT_MARGIN to spare for growth) and not past the food, since the cells skipped
+    # are then all free. Following the cycle itself is safe as long as there are no such skipped
+    # cells left behind the head once the board is nearly full, hence SHORTCUT_MAX_FILL.
+    def __init__(self):
+        self.board = None  # Board the cycle was prepared for
+        self.cycle = None
+        self.order = None  # Position in the cycle per flat cell, -1 for walls
+        self.shortcuts = 0
+
+    def prepare(self, board):
+        # Look up the cycle for a new board, returns False if the layout has none
+        if board is not self.board:
+            self.board = board
+            self.cycle = load_cycle(board.width, board.height, board.walls)
+            self.order = None
+            if self.cycle is not None:
+                self.order = [-1] * (board.width * board.height)
+                for index, cell in enumerate(self.cycle):
+                    self.order[cell] = index
+        return self.cycle is not None
+
+    def next_direction(self, snake, food, board):
+        width = board.width
+        length = len(self.cycle)
+        order = self.order
+        head_x, head_y = snake.head_position()
+        head_index = order[head_y * width + head_x]
+
+        tail_x, tail_y = snake.body[-1]
+        tail_distance = (order[tail_y * width + tail_x] - head_index) % length if len(snake.body) > 1 else length
+        food_distance = length
+        if food.position is not None:
+            food_x, food_y = food.position
+            food_distance = (order[food_y * width + food_x] - head_index) % length
+        limit = min(food_distance, tail_distance - SHORTCUT_MARGIN - snake.growing)
+        if len(snake.body) >= length * SHORTCUT_MAX_FILL:
+            limit = 1
+
+        # The next cell on the cycle, unless a safe shortcut gets further
+        next_cell = self.cycle[(head_index + 1) % length]
+        best_direction = None
+        best_distance = 1
+        for direction, (dx, dy) in DIRECTION_OFFSETS.items():
+            x, y = head_x + dx, head_y + dy
+            if not (0 <= x < width and 0 <= y < board.height):
+                continue
+            cell = y * width + x
+            if cell == next_cell:
+                if best_direction is None:
+                    best_direction = direction
+                continue
+            if direction == OPPOSITE.get(snake.direction) or order[cell] < 0 or snake.occupies((x, y)):
+                continue
+            distance = (order[cell] - head_index) % length
+            if best_distance < distance <= limit:
+                best_direction, best_distance = direction, distance
+
+        if best_distance > 1:
+            self.shortcuts += 1
+        return best_direction
+
+def hamiltonian_steer(snake, food, board, planner, fallback=None):
+    # Point the snake along the cycle. Boards whose walls leave no cycle fall back to fallback,
+    # e.g. a_star_steer with its planner bound; returns False if there was nothing to steer with.
+    if not planner.prepare(board):
+        if fallback is not None:
+            fallback(snake, food, board)
+            return True
+        return False
+
+    direction = planner.next_direction(snake, food, board)
+    if direction is not None:
+        snake.change_direction(direction)
+    return True
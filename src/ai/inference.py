@@ -0,0 +1,53 @@
+import numpy as np
+import torch
+
+class PolicyInference:
+    # Gradient-free action selection for a DeepQNetwork (linear1 -> relu -> linear2).
+    # The forward pass runs in NumPy on preallocated buffers. On CPU the weight arrays are views
+    # of the torch parameters, so optimizer steps and load_state_dict are picked up for free;
+    # on other devices call sync() after the weights change.
+    def __init__(self, model):
+        self.model = model
+        self.state_size = model.linear1.in_features
+        self.hidden_size = model.linear1.out_features
+        self.action_size = model.linear2.out_features
+
+        self.input_buffer = np.zeros(self.state_size, dtype=np.float32)
+        self.hidden_buffer = np.zeros(self.hidden_size, dtype=np.float32)
+        self.output_buffer = np.zeros(self.action_size, dtype=np.float32)
+        self.sync()
+
+    def sync(self):
+        with torch.no_grad():
+            parameters = [
+                self.model.linear1.weight, self.model.linear1.bias,
+                self.model.linear2.weight, self.model.linear2.bias,
+            ]
+            self.shares_memory = all(parameter.device.type == "cpu" for parameter in parameters)
+            if self.shares_memory:
+                arrays = [parameter.detach().numpy() for parameter in parameters]
+            else:
+                arrays = [parameter.detach().cpu().numpy().copy() for parameter in parameters]
+
+        weight1, self.bias1, weight2, self.bias2 = arrays
+        self.weight1 = weight1.T  # (state_size, hidden_size)
+        self.weight2 = weight2.T  # (hidden_size, action_size)
+
+    def q_values(self, state):
+        # Q-values for a single state, written into reused buffers
+        np.copyto(self.input_buffer, state, casting="unsafe")
+        hidden = np.matmul(self.input_buffer, self.weight1, out=self.hidden_buffer)
+        hidden += self.bias1
+        np.maximum(hidden, 0, out=hidden)
+        output = np.matmul(hidden, self.weight2, out=self.output_buffer)
+        output += self.bias2
+        return output
+
+    def best_action(self, state):
+        return int(self.q_values(state).argmax())
+
+    def best_actions(self, states):
+        # Greedy actions for a batch of states, e.g. one per game of a BatchGameEngine
+        states = np.asarray(states, dtype=np.float32)
+        hidden = np.maximum(states @ self.weight1 + self.bias1, 0)
+        return (hidden @ self.weight2 + self.bias2).argmax(axis=1)
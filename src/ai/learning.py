@@ -3,8 +3,25 @@ import torch.nn as nn
 import torch.optim as optim
 import random
 import numpy as np
-from collections import deque
 import os
+from src.ai.replay import ReplayBuffer
+from src.ai.inference import PolicyInference
+from src.ai.scheduler import TrainingScheduler
+
+def cpu_copy(value):
+    # Detached CPU clone of every tensor in a (nested) state dict
+    if isinstance(value, torch.Tensor):
+        return value.detach().to("cpu", copy=True)
+    if isinstance(value, dict):
+        return {key: cpu_copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(cpu_copy(item) for item in value)
+    return value
+
+# Network sizes: 11 state features (see get_state), a hidden layer and one Q-value per action
+STATE_SIZE = 11
+HIDDEN_SIZE = 256
+ACTION_SIZE = 4
 
 class DeepQNetwork(nn.Module):
     def __init__(self, input_size, hidden_size, output_size):
@@ -28,24 +45,38 @@ class DeepQLearningModel:
                  batch_size=1000,
                  epsilon_start=0, 
                  epsilon_end=0,
+                 train_interval=4,
+                 prioritized_replay=False,
+                 gradient_steps=1,
+                 target_sync="hard",
+                 target_update_interval=1000,
+                 tau=0.005,
                 ):
         
         self.state_space_size = state_space_size
         self.action_space_size = action_space_size
         self.gamma = gamma
-        self.memory = deque(maxlen=max_memory)
-        self.batch_size = batch_size
+        self.memory = ReplayBuffer(max_memory, state_space_size, prioritized=prioritized_replay)
+        # Environment steps per update, gradient steps per update, batch size and target sync
+        self.scheduler = TrainingScheduler(
+            steps_per_update=train_interval,
+            gradient_steps=gradient_steps,
+            batch_size=batch_size,
+            target_sync=target_sync,
+            target_update_interval=target_update_interval,
+            tau=tau,
+        )
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"Using device: {self.device}")
 
         # Neural Network
-        self.model = DeepQNetwork(state_space_size, 256, action_space_size).to(self.device)
+        self.model = DeepQNetwork(state_space_size, HIDDEN_SIZE, action_space_size).to(self.device)
         self.optimizer = optim.Adam(self.model.parameters(), lr=learning_rate)
         self.loss_fn = nn.MSELoss()
+        self.inference = PolicyInference(self.model)  # Fast greedy action selection
 
-        self.target_model = DeepQNetwork(state_space_size, 256, action_space_size).to(self.device)
+        self.target_model = DeepQNetwork(state_space_size, HIDDEN_SIZE, action_space_size).to(self.device)
         self.target_model.load_state_dict(self.model.state_dict())  # Copy weights from the main model
-        self.target_update_interval = 1000  # Update target model every 1000 steps
         self.n_games = 0
 
 
@@ -63,20 +94,49 @@ class DeepQLearningModel:
 
         if random.random() < epsilon:
             return random.randint(0, self.action_space_size - 1)  # Explore
-        state_tensor = torch.tensor(state, dtype=torch.float32).unsqueeze(0).to(self.device)
-        q_values = self.model(state_tensor)
-        return torch.argmax(q_values).item()  # Exploit
+        return self.inference.best_action(state)  # Exploit
+
+    def choose_actions(self, states, epsilon=None):
+        # Batched choose_action for many games at once
+        if epsilon is None:
+            epsilon = self.epsilon
+
+        actions = self.inference.best_actions(states)
+        explore = np.random.random(len(actions)) < epsilon
+        actions[explore] = np.random.randint(0, self.action_space_size, explore.sum())
+        return actions
 
     def remember(self, state, action, reward, next_state, done):
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.push(state, action, reward, next_state, done)
+
+    @property
+    def batch_size(self):
+        return self.scheduler.batch_size
+
+    def train_on_schedule(self, steps=1):
+        # Count environment steps, the scheduler runs whatever updates became due
+        return self.scheduler.observe(self, steps)
 
-    def train_step(self, state, action, reward, next_state, done):
+    def replay(self, batch_size=None):
+        # One mini-batch update sampled from the replay buffer, once it holds a full batch.
+        # Returns False if the buffer is still too small.
+        batch_size = batch_size or self.batch_size
+        if len(self.memory) < batch_size:
+            return False
+
+        states, actions, rewards, next_states, dones, indices, weights = self.memory.sample(batch_size)
+        td_errors = self.train_step(states, actions, rewards, next_states, dones, weights)
+        if self.memory.prioritized:
+            self.memory.update_priorities(indices, td_errors)
+        return True
+
+    def train_step(self, state, action, reward, next_state, done, weights=None):
         # Convert to tensors
-        state = torch.tensor(state, dtype=torch.float).to(self.device)
-        next_state = torch.tensor(next_state, dtype=torch.float).to(self.device)
-        action = torch.tensor(action, dtype=torch.long).to(self.device)
-        reward = torch.tensor(reward, dtype=torch.float).to(self.device)
-        done = torch.tensor(done).to(self.device)
+        state = torch.as_tensor(np.asarray(state), dtype=torch.float, device=self.device)
+        next_state = torch.as_tensor(np.asarray(next_state), dtype=torch.float, device=self.device)
+        action = torch.as_tensor(np.asarray(action), dtype=torch.long, device=self.device)
+        reward = torch.as_tensor(np.asarray(reward), dtype=torch.float, device=self.device)
+        done = torch.as_tensor(np.asarray(done), dtype=torch.bool, device=self.device)
 
         if len(state.shape) == 1:  # Handle single state case
             state = state.unsqueeze(0)
@@ -93,11 +153,48 @@ class DeepQLearningModel:
             max_next_q_values = self.target_model(next_state).max(1)[0]
             target = reward + self.gamma * max_next_q_values * (~done)
 
-        # Backpropagation
-        loss = self.loss_fn(q_values, target)
+        # Backpropagation, weighted by importance-sampling corrections for prioritized replay
+        if weights is None:
+            loss = self.loss_fn(q_values, target)
+        else:
+            weights = torch.as_tensor(weights, dtype=torch.float, device=self.device)
+            loss = (weights * (q_values - target) ** 2).mean()
         self.optimizer.zero_grad()
         loss.backward()
         self.optimizer.step()
+        if not self.inference.shares_memory:
+            self.inference.sync()
+
+        # Absolute TD errors, used to refresh replay priorities
+        return (q_values - target).abs().detach().cpu().numpy()
+
+    def training_state(self, include_replay=False):
+        # CPU copy of everything needed to resume training: networks, Adam moments, exploration
+        # and counters, optionally the replay buffer. Later training steps do not change the copy.
+        state = {
+            "model": cpu_copy(self.model.state_dict()),
+            "target_model": cpu_copy(self.target_model.state_dict()),
+            "optimizer": cpu_copy(self.optimizer.state_dict()),
+            "epsilon": self.epsilon,
+            "epsilon_min": self.epsilon_min,
+            "n_games": self.n_games,
+            "scheduler": self.scheduler.state_dict(),
+        }
+        if include_replay:
+            state["replay"] = self.memory.state_dict()
+        return state
+
+    def load_training_state(self, state):
+        self.model.load_state_dict(state["model"])
+        self.target_model.load_state_dict(state["target_model"])
+        self.optimizer.load_state_dict(state["optimizer"])  # Moved to the parameters' device by torch
+        self.epsilon = state["epsilon"]
+        self.epsilon_min = state["epsilon_min"]
+        self.n_games = state["n_games"]
+        self.scheduler.load_state_dict(state.get("scheduler", {}))
+        if "replay" in state:
+            self.memory.load_state_dict(state["replay"])
+        self.inference.sync()
 
     def save_model(self, filename="model.pth"):
         torch.save(self.model.state_dict(), filename)
@@ -106,6 +203,7 @@ class DeepQLearningModel:
         if os.path.exists(filename):
             self.model.load_state_dict(torch.load(filename, map_location=torch.device('cpu')))
             self.model.eval()  # Switch to evaluation mode
+            self.inference.sync()
             print("Model loaded successfully.")
         else:
             print("No saved model found. Starting fresh.")
@@ -156,10 +254,15 @@ class DeepQLearningModel:
         else:
             return -1  # Small penalty for moving farther away
         
-    def update_target_model(self):
-        if self.n_games % 10 == 0:  # Update every 10 games
-            self.target_model.load_state_dict(self.model.state_dict())
-            print("Target model updated.")
+    def update_target_model(self, tau=1.0):
+        # Move the target network towards the online one: tau=1 copies it (hard sync),
+        # a small tau Polyak-averages it in (soft sync). Called by the training scheduler.
+        with torch.no_grad():
+            for target, source in zip(self.target_model.parameters(), self.model.parameters()):
+                if tau >= 1.0:
+                    target.copy_(source)
+                else:
+                    target.lerp_(source, tau)
 
 
 
@@ -0,0 +1,91 @@
+_neighbor_tables = {}
+
+def neighbor_table(grid_width, grid_height):
+    # Flat neighbor cells of every cell in UP, DOWN, LEFT, RIGHT order, built once per board size
+    key = (grid_width, grid_height)
+    table = _neighbor_tables.get(key)
+    if table is None:
+        table = []
+        for cell in range(grid_width * grid_height):
+            x, y = cell % grid_width, cell // grid_width
+            neighbors = []
+            if y > 0:
+                neighbors.append(cell - grid_width)  # UP
+            if y < grid_height - 1:
+                neighbors.append(cell + grid_width)  # DOWN
+            if x > 0:
+                neighbors.append(cell - 1)  # LEFT
+            if x < grid_width - 1:
+                neighbors.append(cell + 1)  # RIGHT
+            table.append(tuple(neighbors))
+        _neighbor_tables[key] = table
+    return table
+
+def blocked_grid(snake_body, walls, grid_width, grid_height):
+    # Flat occupancy grid (1 = snake or wall) from grid-coordinate body segments and walls
+    blocked = bytearray(grid_width * grid_height)
+    for cells in (snake_body, walls):
+        for x, y in cells:
+            if 0 <= x < grid_width and 0 <= y < grid_height:
+                blocked[y * grid_width + x] = 1
+    return blocked
+
+class Reachability:
+    # Connected-component labelling of the free cells, done once per occupancy grid.
+    # Afterwards the reachable area from any cell, or whether a cell such as the tail can be
+    # reached, is a constant-time lookup instead of a fresh flood fill per candidate move.
+    def __init__(self, blocked, grid_width, grid_height):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.labels = [-1] * (grid_width * grid_height)  # Region id per cell, -1 for blocked cells
+        self.sizes = []  # Cell count per region id
+
+        neighbors = neighbor_table(grid_width, grid_height)
+        labels = self.labels
+        for start in range(grid_width * grid_height):
+            if blocked[start] or labels[start] != -1:
+                continue
+
+            region = len(self.sizes)
+            labels[start] = region
+            stack = [start]
+            size = 0
+            while stack:
+                cell = stack.pop()
+                size += 1
+                for neighbor in neighbors[cell]:
+                    if not blocked[neighbor] and labels[neighbor] == -1:
+                        labels[neighbor] = region
+                        stack.append(neighbor)
+            self.sizes.append(size)
+
+    def region(self, x, y):
+        if 0 <= x < self.grid_width and 0 <= y < self.grid_height:
+            return self.labels[y * self.grid_width + x]
+        return -1
+
+    def area(self, x, y):
+        # Number of free cells reachable from (x, y), 0 if the cell itself is blocked
+        region = self.region(x, y)
+        return self.sizes[region] if region >= 0 else 0
+
+    def reaches(self, x, y, target_x, target_y):
+        # Whether the region around (x, y) contains or borders the target, e.g. the snake's tail
+        region = self.region(x, y)
+        if region < 0:
+            return False
+        if self.region(target_x, target_y) == region:
+            return True
+        return any(
+            self.region(target_x + dx, target_y + dy) == region
+            for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0))
+        )
+
+    def move_areas(self, x, y):
+        # Reachable area behind each of the four moves from (x, y), in UP, DOWN, LEFT, RIGHT order
+        return [
+            ("UP", self.area(x, y - 1)),
+            ("DOWN", self.area(x, y + 1)),
+            ("LEFT", self.area(x - 1, y)),
+            ("RIGHT", self.area(x + 1, y)),
+        ]
@@ -0,0 +1,119 @@
+import numpy as np
+import torch
+
+class ReplayBuffer:
+    # Fixed-size ring buffer of transitions stored in preallocated NumPy arrays.
+    # Sampling is uniform, or proportional to priority**alpha when prioritized is enabled.
+    def __init__(self, capacity, state_size, prioritized=False, alpha=0.6, beta=0.4, priority_epsilon=1e-5):
+        self.capacity = capacity
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.beta = beta
+        self.priority_epsilon = priority_epsilon
+        self.priorities = np.zeros(capacity, dtype=np.float32) if prioritized else None
+        self.max_priority = 1.0
+
+        self.position = 0  # Next slot to write
+        self.size = 0
+        self.rng = np.random.default_rng()
+
+    def __len__(self):
+        return self.size
+
+    def push(self, state, action, reward, next_state, done):
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        if self.prioritized:
+            self.priorities[i] = self.max_priority  # New transitions are sampled at least once soon
+
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        # Write a batch of transitions at once, wrapping around the end of the buffer
+        count = len(actions)
+        indices = (self.position + np.arange(count)) % self.capacity
+        self.states[indices] = states
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.next_states[indices] = next_states
+        self.dones[indices] = dones
+        if self.prioritized:
+            self.priorities[indices] = self.max_priority
+
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def sample(self, batch_size):
+        # Returns (states, actions, rewards, next_states, dones, indices, weights).
+        # Weights are importance-sampling corrections for prioritized replay, all ones otherwise.
+        if self.prioritized:
+            scaled = self.priorities[:self.size] ** self.alpha
+            probabilities = scaled / scaled.sum()
+            indices = self.rng.choice(self.size, size=batch_size, p=probabilities)
+            weights = (self.size * probabilities[indices]) ** -self.beta
+            weights = (weights / weights.max()).astype(np.float32)
+        else:
+            indices = self.rng.integers(0, self.size, size=batch_size)
+            weights = np.ones(batch_size, dtype=np.float32)
+
+        return (
+            self.states[indices],
+            self.actions[indices],
+            self.rewards[indices],
+            self.next_states[indices],
+            self.dones[indices],
+            indices,
+            weights,
+        )
+
+    def state_dict(self):
+        # Copy of the stored transitions as tensors, so checkpoints load with torch.load(weights_only=True)
+        size = self.size
+        state = {
+            "capacity": self.capacity,
+            "position": self.position,
+            "size": size,
+            "max_priority": self.max_priority,
+            "states": torch.from_numpy(self.states[:size].copy()),
+            "actions": torch.from_numpy(self.actions[:size].copy()),
+            "rewards": torch.from_numpy(self.rewards[:size].copy()),
+            "next_states": torch.from_numpy(self.next_states[:size].copy()),
+            "dones": torch.from_numpy(self.dones[:size].copy()),
+        }
+        if self.prioritized:
+            state["priorities"] = torch.from_numpy(self.priorities[:size].copy())
+        return state
+
+    def load_state_dict(self, state):
+        # Restore transitions saved by state_dict, keeping the newest ones if the capacity shrank
+        size = state["size"]
+        keep = min(size, self.capacity)
+        order = (state["position"] - size + np.arange(size)) % size if size == state["capacity"] else np.arange(size)
+        order = order[size - keep:]  # Oldest first, so the newest transitions survive a smaller buffer
+        self.states[:keep] = state["states"].numpy()[order]
+        self.actions[:keep] = state["actions"].numpy()[order]
+        self.rewards[:keep] = state["rewards"].numpy()[order]
+        self.next_states[:keep] = state["next_states"].numpy()[order]
+        self.dones[:keep] = state["dones"].numpy()[order]
+        if self.prioritized:
+            priorities = state.get("priorities")
+            self.priorities[:keep] = priorities.numpy()[order] if priorities is not None else state["max_priority"]
+        self.max_priority = state["max_priority"]
+        self.size = keep
+        self.position = keep % self.capacity
+
+    def update_priorities(self, indices, td_errors):
+        priorities = np.abs(td_errors) + self.priority_epsilon
+        self.priorities[indices] = priorities
+        self.max_priority = max(self.max_priority, float(priorities.max()))
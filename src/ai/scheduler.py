@@ -0,0 +1,86 @@
+import time
+
+TARGET_SYNC_MODES = ("hard", "soft")
+
+class TrainingScheduler:
+    # Decides when and how much the learner trains, so simulation throughput and learner
+    # throughput can be traded against each other:
+    #   steps_per_update   environment steps collected between updates
+    #   gradient_steps     mini-batch gradient steps per update
+    #   batch_size         transitions per mini-batch
+    #   target_sync        "hard": copy the network into the target every target_update_interval
+    #                      gradient steps; "soft": Polyak-average it in by tau after every step
+    # Counters cover environment steps, gradient steps, transitions trained on and target syncs;
+    # rates() turns them into samples/sec and updates/sec.
+    def __init__(self, steps_per_update=4, gradient_steps=1, batch_size=1000, target_sync="hard",
+                 target_update_interval=1000, tau=0.005):
+        if target_sync not in TARGET_SYNC_MODES:
+            raise ValueError(f"Unknown target sync {target_sync!r}, expected one of {TARGET_SYNC_MODES}.")
+        self.steps_per_update = max(1, steps_per_update)
+        self.gradient_steps = max(1, gradient_steps)
+        self.batch_size = batch_size
+        self.target_sync = target_sync
+        self.target_update_interval = max(1, target_update_interval)
+        self.tau = tau
+
+        self.env_steps = 0
+        self.updates = 0  # Gradient steps
+        self.samples = 0  # Transitions trained on, batch_size per gradient step
+        self.target_syncs = 0  # Hard copies or soft updates of the target network
+        self.pending_steps = 0  # Environment steps not yet paid for with an update
+        self.rate_mark = (time.perf_counter(), 0, 0, 0)  # Time, env steps, updates, samples at the last rates()
+        self.last_rates = {"steps_per_second": 0.0, "updates_per_second": 0.0, "samples_per_second": 0.0}
+
+    def observe(self, learning_model, steps=1):
+        # Count steps environment steps and run every update that became due.
+        # Returns the number of gradient steps taken.
+        self.env_steps += steps
+        self.pending_steps += steps
+        taken = 0
+        while self.pending_steps >= self.steps_per_update:
+            self.pending_steps -= self.steps_per_update
+            for _ in range(self.gradient_steps):
+                if not learning_model.replay(self.batch_size):
+                    # Replay buffer still smaller than a batch: warm-up steps are not owed later
+                    self.pending_steps = 0
+                    return taken
+                taken += 1
+                self.after_gradient_step(learning_model)
+        return taken
+
+    def after_gradient_step(self, learning_model):
+        self.updates += 1
+        self.samples += self.batch_size
+        if self.target_sync == "soft":
+            learning_model.update_target_model(self.tau)
+            self.target_syncs += 1
+        elif self.updates % self.target_update_interval == 0:
+            learning_model.update_target_model()
+            self.target_syncs += 1
+
+    def rates(self, min_interval=0.0):
+        # Env steps/sec, updates/sec and samples/sec since the previous call. Calls less than
+        # min_interval seconds apart get the previous rates, e.g. for a panel redrawn every frame.
+        now = time.perf_counter()
+        last_time, last_steps, last_updates, last_samples = self.rate_mark
+        if now - last_time < min_interval:
+            return self.last_rates
+        self.rate_mark = (now, self.env_steps, self.updates, self.samples)
+        elapsed = max(now - last_time, 1e-9)
+        self.last_rates = {
+            "steps_per_second": (self.env_steps - last_steps) / elapsed,
+            "updates_per_second": (self.updates - last_updates) / elapsed,
+            "samples_per_second": (self.samples - last_samples) / elapsed,
+        }
+        return self.last_rates
+
+    def state_dict(self):
+        return {"env_steps": self.env_steps, "updates": self.updates, "samples": self.samples,
+                "target_syncs": self.target_syncs}
+
+    def load_state_dict(self, state):
+        self.env_steps = state.get("env_steps", 0)
+        self.updates = state.get("updates", 0)
+        self.samples = state.get("samples", 0)
+        self.target_syncs = state.get("target_syncs", 0)
+        self.rate_mark = (time.perf_counter(), self.env_steps, self.updates, self.samples)
@@ -0,0 +1,214 @@
+import numpy as np
+
+from config.settings import *
+
+# Action/direction indices match the order used by the learning model: UP, DOWN, LEFT, RIGHT.
+# A direction of -1 means the snake has not started moving yet.
+DIRECTION_DX = np.array([0, 0, -1, 1])
+DIRECTION_DY = np.array([-1, 1, 0, 0])
+OPPOSITE = np.array([1, 0, 3, 2])
+TURN_LEFT = np.array([2, 3, 1, 0])
+TURN_RIGHT = np.array([3, 2, 0, 1])
+
+REWARD_DEATH = -10
+REWARD_FOOD = 20
+REWARD_CLOSER = 2
+REWARD_FARTHER = -1
+
+class BatchGameEngine:
+    # Steps N independent snake games at once with NumPy arrays in grid coordinates.
+    # Reproduces Snake.move, Food.spawn, Board.is_within_bounds/has_collision and the
+    # learning model's get_state/get_reward, including their quirks:
+    #   - danger checks treat the tail as blocked even though it would move away,
+    #   - the reward looks one tile past the head, as get_reward does after moving,
+    #   - step() returns the state observed after moving but before food/collision
+    #     are resolved, exactly like the transition recorded by Game.update.
+    def __init__(self, num_envs, grid_width=GRID_WIDTH, grid_height=GRID_HEIGHT,
+                 num_walls=0, max_idle_ticks=2000, seed=None):
+        self.num_envs = num_envs
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.num_cells = grid_width * grid_height
+        self.num_walls = num_walls
+        self.max_idle_ticks = max_idle_ticks
+        self.rng = np.random.default_rng(seed)
+
+        n = num_envs
+        self.capacity = self.num_cells + 2  # Head may briefly overlap the body on a collision
+        self.body = np.zeros((n, self.capacity), dtype=np.int32)  # Ring buffer of flat cell indices
+        self.head_ptr = np.zeros(n, dtype=np.int32)
+        self.length = np.zeros(n, dtype=np.int32)
+        self.occupancy = np.zeros((n, self.num_cells), dtype=np.int16)  # Body segments per cell
+        self.walls = np.zeros((n, self.num_cells), dtype=bool)
+        self.head_x = np.zeros(n, dtype=np.int32)
+        self.head_y = np.zeros(n, dtype=np.int32)
+        self.direction = np.full(n, -1, dtype=np.int8)
+        self.growing = np.zeros(n, dtype=bool)
+        self.food = np.full(n, -1, dtype=np.int32)  # Flat index, -1 when the board is full
+        self.score = np.zeros(n, dtype=np.int32)
+        self.idle_timer = np.zeros(n, dtype=np.int32)
+        self.last_scores = np.zeros(n, dtype=np.int32)  # Final score of envs that finished on the last step
+
+        self.reset()
+
+    # -----------------
+    # Reset
+    # -----------------
+
+    def reset(self, mask=None):
+        # Reset every env, or only those selected by a boolean mask
+        envs = np.arange(self.num_envs) if mask is None else np.flatnonzero(mask)
+        if len(envs) == 0:
+            return
+
+        self.occupancy[envs] = 0
+        self.walls[envs] = False
+        if self.num_walls > 0:
+            # Distinct random cells per env, like Board.generate_walls
+            keys = self.rng.random((len(envs), self.num_cells))
+            wall_cells = np.argpartition(keys, self.num_walls - 1, axis=1)[:, :self.num_walls]
+            self.walls[envs[:, None], wall_cells] = True
+
+        start_x = self.grid_width // 2
+        start_y = self.grid_height // 2
+        start = start_y * self.grid_width + start_x
+        self.head_ptr[envs] = 0
+        self.body[envs, 0] = start
+        self.length[envs] = 1
+        self.occupancy[envs, start] = 1
+        self.head_x[envs] = start_x
+        self.head_y[envs] = start_y
+        self.direction[envs] = -1
+        self.growing[envs] = False
+        self.score[envs] = 0
+        self.idle_timer[envs] = 0
+        self.spawn_food(envs)
+
+    def spawn_food(self, envs):
+        # Pick a uniformly random cell that is neither snake nor wall for each env
+        free = (self.occupancy[envs] == 0) & ~self.walls[envs]
+        counts = free.sum(axis=1)
+        picks = (self.rng.random(len(envs)) * counts).astype(np.int64)
+        cumulative = np.cumsum(free, axis=1)
+        cells = np.argmax(cumulative > picks[:, None], axis=1)
+        self.food[envs] = np.where(counts > 0, cells, -1)
+
+    # -----------------
+    # Queries
+    # -----------------
+
+    def in_bounds(self, x, y):
+        return (x >= 0) & (x < self.grid_width) & (y >= 0) & (y < self.grid_height)
+
+    def blocked(self, x, y):
+        # Vectorized Snake.will_collide lookup: out of bounds, any body segment or a wall
+        inside = self.in_bounds(x, y)
+        cells = np.where(inside, y * self.grid_width + x, 0)
+        rows = np.arange(self.num_envs)
+        return ~inside | (self.occupancy[rows, cells] > 0) | self.walls[rows, cells]
+
+    def has_collision(self):
+        # Head overlapping another segment or a wall after moving
+        inside = self.in_bounds(self.head_x, self.head_y)
+        cells = np.where(inside, self.head_y * self.grid_width + self.head_x, 0)
+        rows = np.arange(self.num_envs)
+        return inside & ((self.occupancy[rows, cells] > 1) | self.walls[rows, cells])
+
+    def food_xy(self):
+        return self.food % self.grid_width, self.food // self.grid_width
+
+    def observe(self):
+        # Vectorized DeepQLearningModel.get_state for every env
+        states = np.zeros((self.num_envs, 11), dtype=int)
+        moving = self.direction >= 0
+        direction = np.where(moving, self.direction, 0)
+
+        for column, turn in enumerate((None, TURN_LEFT, TURN_RIGHT)):
+            d = direction if turn is None else turn[direction]
+            danger = self.blocked(self.head_x + DIRECTION_DX[d], self.head_y + DIRECTION_DY[d])
+            states[:, column] = danger & moving
+
+        states[np.flatnonzero(moving), 3 + direction[moving]] = 1
+
+        has_food = self.food >= 0
+        food_x, food_y = self.food_xy()
+        states[:, 7] = has_food & (food_x < self.head_x)
+        states[:, 8] = has_food & (food_x > self.head_x)
+        states[:, 9] = has_food & (food_y < self.head_y)
+        states[:, 10] = has_food & (food_y > self.head_y)
+        return states
+
+    def rewards(self):
+        # Vectorized DeepQLearningModel.get_reward, evaluated after the snake has moved
+        direction = np.where(self.direction >= 0, self.direction, 0)
+        step = self.direction >= 0
+        next_x = self.head_x + DIRECTION_DX[direction] * step
+        next_y = self.head_y + DIRECTION_DY[direction] * step
+        food_x, food_y = self.food_xy()
+
+        dist_before = np.abs(self.head_x - food_x) + np.abs(self.head_y - food_y)
+        dist_after = np.abs(next_x - food_x) + np.abs(next_y - food_y)
+
+        rewards = np.where(dist_after < dist_before, REWARD_CLOSER, REWARD_FARTHER)
+        rewards = np.where((next_x == food_x) & (next_y == food_y), REWARD_FOOD, rewards)
+        dying = ~self.in_bounds(next_x, next_y) | self.has_collision()
+        return np.where(dying, REWARD_DEATH, rewards)
+
+    # -----------------
+    # Stepping
+    # -----------------
+
+    def move(self, envs):
+        # Snake.move for the selected envs: push the new head, pop the tail unless growing
+        direction = self.direction[envs]
+        self.head_x[envs] += DIRECTION_DX[direction]
+        self.head_y[envs] += DIRECTION_DY[direction]
+
+        self.head_ptr[envs] = (self.head_ptr[envs] - 1) % self.capacity
+        inside = self.in_bounds(self.head_x[envs], self.head_y[envs])
+        cells = np.where(inside, self.head_y[envs] * self.grid_width + self.head_x[envs], -1)
+        self.body[envs, self.head_ptr[envs]] = cells
+        np.add.at(self.occupancy, (envs[inside], cells[inside]), 1)
+        self.length[envs] += 1
+
+        shrinking = envs[~self.growing[envs]]
+        tail_ptr = (self.head_ptr[shrinking] + self.length[shrinking] - 1) % self.capacity
+        tails = self.body[shrinking, tail_ptr]
+        valid = tails >= 0
+        np.add.at(self.occupancy, (shrinking[valid], tails[valid]), -1)
+        self.length[shrinking] -= 1
+        self.growing[envs] = False
+
+    def step(self, actions):
+        # Advance every env one tick with an action vector.
+        # Returns (next_states, rewards, dones); finished envs are reset afterwards and their
+        # final score is kept in last_scores. Idle timeouts end with a reward of 0.
+        actions = np.asarray(actions, dtype=np.int8)
+
+        self.idle_timer += 1
+        timed_out = self.idle_timer > self.max_idle_ticks
+        active = ~timed_out
+
+        # Snake.change_direction: any direction to start, never a reversal afterwards
+        allowed = active & ((self.direction < 0) | (actions != OPPOSITE[self.direction]))
+        self.direction = np.where(allowed, actions, self.direction)
+
+        self.move(np.flatnonzero(active))
+
+        next_states = self.observe()
+        rewards = np.where(active, self.rewards(), 0)
+
+        # Resolve food and collisions, like GameEngine.resolve
+        food_x, food_y = self.food_xy()
+        ate = active & (self.food >= 0) & (self.head_x == food_x) & (self.head_y == food_y)
+        died = active & ~ate & (~self.in_bounds(self.head_x, self.head_y) | self.has_collision())
+
+        eaters = np.flatnonzero(ate)
+        self.score[eaters] += 1
+        self.growing[eaters] = True
+        self.spawn_food(eaters)
+
+        dones = died | timed_out
+        self.last_scores = np.where(dones, self.score, 0)
+        self.reset(dones)
+        return next_states, rewards, dones
@@ -1,15 +1,20 @@
 import random
-import pygame
+from src.game.free_cells import FreeCells
 
 class Board:
-    def __init__(self, width, height, tile_size, num_walls=0):
-        self.width = width
+    # All positions are (x, y) cell indices, pixels only come into play when drawing
+    def __init__(self, width, height, num_walls=0, rng=None):
+        self.rng = rng or random  # Source of wall and food positions, seed it for reproducible games
+        self.width = width  # In cells
         self.height = height
-        self.tile_size = tile_size
-        self.grid_width = width // tile_size
-        self.grid_height = height // tile_size
         self.num_walls = num_walls
         self.walls = self.generate_walls(num_walls)
+
+        # Positions that are neither wall nor snake, kept up to date by the snake as it moves
+        self.free_cells = FreeCells(
+            ((x, y) for x in range(self.width) for y in range(self.height) if (x, y) not in self.walls),
+            rng=self.rng,
+        )
     
     # check bounds on the board
     def is_within_bounds(self, position):
@@ -19,14 +24,23 @@ class Board:
     def generate_walls(self, num_walls):
         walls = set()
         while len(walls) < self.num_walls:
-            wall_x = random.randint(0, self.grid_width - 1) * self.tile_size
-            wall_y = random.randint(0, self.grid_height - 1) * self.tile_size
+            wall_x = self.rng.randint(0, self.width - 1)
+            wall_y = self.rng.randint(0, self.height - 1)
             walls.add((wall_x, wall_y))
         return walls
 
     def is_wall(self, position):
         return position in self.walls
 
-    def draw(self, surface):
-        for wall in self.walls:
-            pygame.draw.rect(surface, (128, 128, 128), (*wall, self.tile_size, self.tile_size))
+    def add_wall(self, position):
+        self.walls.add(position)
+        self.free_cells.discard(position)
+
+    # mark a position as taken by the snake
+    def occupy(self, position):
+        self.free_cells.discard(position)
+
+    # give a position back once the snake has left it
+    def release(self, position):
+        if self.is_within_bounds(position) and not self.is_wall(position):
+            self.free_cells.add(position)
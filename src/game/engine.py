@@ -0,0 +1,67 @@
+import random
+
+from config.settings import *
+from src.game.board import Board
+from src.game.snake import Snake
+from src.game.food import Food
+
+class GameEngine:
+    # Pure simulation core (board, snake, food, scoring) with no display or pygame dependency.
+    # Game wraps it for rendering; automated runs can step it as fast as the CPU allows.
+    # Board size is in cells and independent of the window, positions are (x, y) cell indices
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, num_walls=0, max_idle_ticks=2000, seed=None):
+        self.width = width
+        self.height = height
+        self.num_walls = num_walls
+        self.max_idle_ticks = max_idle_ticks  # Maximum ticks before ending the round due to inactivity
+        # Walls and food come from this generator, a seed makes every game of the engine reproducible
+        self.rng = random.Random(seed) if seed is not None else random
+        self.reset()
+
+    def reset(self, seed=None):
+        # A seed restarts the generator, so the new game can be reproduced from the seed alone
+        if seed is not None:
+            self.rng = random.Random(seed)
+        self.idle_timer = 0
+        self.board = Board(self.width, self.height, num_walls=self.num_walls, rng=self.rng)
+        initial_position = (self.width // 2, self.height // 2)
+        self.snake = Snake(initial_position, board=self.board)
+        self.food = Food(self.board, self.snake)
+        self.score = 0
+        self.done = False
+
+    def tick(self):
+        # Advance the idle timer, returns True once the round has run out of ticks
+        self.idle_timer += 1
+        if self.idle_timer > self.max_idle_ticks:
+            self.done = True
+        return self.done
+
+    def move(self, direction=None):
+        # Apply an optional direction change and move the snake one tile
+        if direction is not None:
+            self.snake.change_direction(direction)
+        self.snake.move()
+
+    def resolve(self):
+        # Eat food or detect a collision after the snake has moved, returns True if food was eaten
+        head = self.snake.head_position()
+        if head == self.food.position:
+            self.score += 1
+            self.snake.grow()
+            self.food.position = self.food.spawn(self.snake.body)
+            if self.food.position is None:
+                self.done = True  # The snake fills the board
+            return True
+
+        if not self.board.is_within_bounds(head) or self.snake.has_collision(self.board):
+            self.done = True
+        return False
+
+    def step(self, direction=None):
+        # Run one full tick, returns (ate_food, done)
+        if self.tick():
+            return False, True
+        self.move(direction)
+        ate_food = self.resolve()
+        return ate_food, self.done
@@ -1,28 +1,22 @@
-import pygame
-import random
-
 class Food:
-    def __init__(self, board, snake, tile_size):
+    def __init__(self, board, snake):
         self.board = board
         self.snake = snake
-        self.tile_size = tile_size
         self.position = self.spawn(snake.body)
 
     def spawn(self, snake_body):
         # Spawns the food, somewhere random where the snake is not 
+        if self.snake.board is self.board:
+            # The snake keeps the board's free-cell index current, so no grid scan is needed
+            return self.board.free_cells.choice()
+
         empty_positions = [
-            (x * self.tile_size, y * self.tile_size)
-            for x in range(self.board.grid_width)
-            for y in range(self.board.grid_height)
-            if (x * self.tile_size, y * self.tile_size) not in snake_body
-            and (x * self.tile_size, y * self.tile_size) not in self.board.walls
+            (x, y)
+            for x in range(self.board.width)
+            for y in range(self.board.height)
+            if (x, y) not in snake_body
+            and (x, y) not in self.board.walls
         ]
         
         # Select a random empty position
-        return random.choice(empty_positions) if empty_positions else None
-
-    # Function to draw food randomly on board
-    def draw(self, surface):
-        if self.position:
-            x, y = self.position
-            pygame.draw.rect(surface, (255, 0, 0), (x, y, self.tile_size, self.tile_size))
+        return self.board.rng.choice(empty_positions) if empty_positions else None
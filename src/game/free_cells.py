@@ -0,0 +1,36 @@
+import random
+
+class FreeCells:
+    # Indexable set of free board positions: O(1) add, discard, membership and random choice.
+    # Positions live in a list for random access, removals swap the last entry into the hole.
+    def __init__(self, positions=(), rng=None):
+        self.rng = rng or random  # Any object with a choice method, e.g. a seeded random.Random
+        self.positions = []
+        self.index = {}
+        for position in positions:
+            self.add(position)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, position):
+        return position in self.index
+
+    def add(self, position):
+        if position in self.index:
+            return
+        self.index[position] = len(self.positions)
+        self.positions.append(position)
+
+    def discard(self, position):
+        i = self.index.pop(position, None)
+        if i is None:
+            return
+        last = self.positions.pop()
+        if i < len(self.positions):
+            self.positions[i] = last
+            self.index[last] = i
+
+    def choice(self):
+        # Random free position, or None when the board is full
+        return self.rng.choice(self.positions) if self.positions else None
@@ -1,20 +1,37 @@
 import pygame
 import json
+import random
+import time
 from config.settings import * 
 from src.ai.a_star import *
-from src.ai.learning import DeepQLearningModel
+from src.ai.features import FeatureExtractor
+from src.ai.hamiltonian import HamiltonianPlanner, hamiltonian_steer
 from src.ai.ai_controller import * 
-from src.game.snake import Snake
-from src.game.food import Food
-from src.game.board import Board
+from src.game.engine import GameEngine
+from src.game.run_store import RunStore, save_snapshot
+from src.game.renderer import Renderer
+from src.game.profiler import PhaseProfiler
+from src.game.metrics import MetricsAggregator
+from src.game.recording import Recording, RecordingStore
 from src.ai.visualization import *
 
+DIRECTIONS = ["UP", "DOWN", "LEFT", "RIGHT"]
+SPEED_UP_KEYS = (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS)
+SLOW_DOWN_KEYS = (pygame.K_MINUS, pygame.K_KP_MINUS)
+
 class Game:
-    def __init__(self, automate=False, max_runs=1, testing=False, num_walls=0):
-        pygame.init()
-        self.window = pygame.display.set_mode((WIDTH + LOG_WIDTH, HEIGHT))
-        pygame.display.set_caption("Snake Game")
-        self.clock = pygame.time.Clock()
+    def __init__(self, automate=False, max_runs=1, testing=False, num_walls=0, headless=False, profile=False,
+                 record=True, resume=False):
+        # Headless runs skip the window, rendering and frame limiter entirely
+        self.headless = headless
+        if self.headless and not (automate or testing):
+            raise ValueError("Headless mode requires automate or testing to be enabled.")
+
+        if not self.headless:
+            pygame.init()
+            self.window = pygame.display.set_mode((WIDTH + LOG_WIDTH, HEIGHT))
+            pygame.display.set_caption("Snake Game")
+            self.clock = pygame.time.Clock()
 
         # Automation setup
         self.automate = automate
@@ -23,16 +40,15 @@ class Game:
         self.current_run = 0
         self.num_walls = num_walls
 
-        self.idle_timer = 0
-        self.max_idle_ticks = 2000  # Maximum ticks before ending the round due to inactivity
-        
-        self.learning_model = DeepQLearningModel(
-            state_space_size=11,
-            action_space_size=4,
-            learning_rate=0.002,
-            gamma=0.9
-        )
-        self.learning_model.load_model("model.pth")
+        # Simulation core, rebuilt on every reset_game
+        self.engine = GameEngine(GRID_WIDTH, GRID_HEIGHT, num_walls=num_walls, max_idle_ticks=2000)
+        self.a_star_planner = AStarPlanner()
+        self.hamiltonian_planner = HamiltonianPlanner()
+
+        self._learning_model = None  # Created on first use, see the learning_model property
+        self.checkpoints = None  # Training checkpoints, created with the learning model when training
+        self.resume = resume  # Testing plays the newest checkpoint instead of model.pth
+        self.features = FeatureExtractor()
 
         # Initialize score tracking for visualization graphing
         self.scores = []  # List to store scores for plotting
@@ -43,12 +59,26 @@ class Game:
         self.a_star_stats = {"runs": 0, "highest_score": 0, "total_score": 0, "last_score": 0}
         self.learning_stats = {"runs": 0, "highest_score": 0, "total_score": 0, "last_score": 0}
         self.testing_stats = {"runs": 0, "highest_score": 0, "total_score": 0, "last_score": 0}
+        self.hamiltonian_stats = {"runs": 0, "highest_score": 0, "total_score": 0, "last_score": 0}
         self.current_automation_stats = []  # List to store run and score for current automation
-        self.run_data = {NORMAL_MODE: [], A_STAR_MODE: [], LEARNING_MODE: [], TESTING_MODE: []}
+        # Windowed score statistics per mode for the panel and reports, snapshotted to disk in the background
+        self.metrics = MetricsAggregator("data/live_metrics.json")
+        self.metrics.start()
+        # Append-only run history per mode, legacy JSON files are migrated on first use
+        self.run_stores = {
+            mode: RunStore(f"data/{mode}_run_data.jsonl", legacy_path=f"data/{mode}_run_data.json")
+            for mode in [NORMAL_MODE, A_STAR_MODE, LEARNING_MODE, TESTING_MODE, HAMILTONIAN_MODE]
+        }
+        # Every game as seed plus directions, replay them with python -m src.game.recording
+        self.record = record
+        self.recording = None
+        self.recording_stores = {
+            mode: RecordingStore(f"data/{mode}_recordings.bin")
+            for mode in [NORMAL_MODE, A_STAR_MODE, LEARNING_MODE, TESTING_MODE, HAMILTONIAN_MODE]
+        }
 
         # Load data from files
         self.load_statistics()
-        self.load_run_data()
 
         # Set mode
         if self.testing:
@@ -62,19 +92,72 @@ class Game:
         self.running = True
         self.paused = not self.automate
         self.game_over = False
-        self.font = pygame.font.SysFont("Arial", 18)
+        self.font = None if self.headless else pygame.font.SysFont("Arial", 18)
+        self.renderer = None if self.headless else Renderer(self.window, self.font)
+
+        # Fast-forward: simulation runs at SNAKE_SPEED * speed_multiplier ticks/sec, rendered at SNAKE_SPEED fps
+        self.speed_multiplier = 1
+        self.pending_ticks = 0.0
+        self.frame_time = 1000 / SNAKE_SPEED  # Milliseconds taken by the last frame
         self.logs = []
+        self.profiler = PhaseProfiler(enabled=profile)  # Per-phase timings, shown in the side panel
         self.position_message = ""
         self.goal_text = ""
 
-        if self.automate:
-            reset_automation_data()  # Reset the file
-
-
         # Initialize game components
         self.reset_game()
         print("Game initialized successfully.")
 
+    # -----------------
+    # Simulation State
+    # -----------------
+
+    @property
+    def learning_model(self):
+        # Torch and model.pth are only loaded once a learning or testing game needs the network
+        if self._learning_model is None:
+            from src.ai.learning import DeepQLearningModel
+
+            self._learning_model = DeepQLearningModel(
+                state_space_size=11,
+                action_space_size=4,
+                learning_rate=0.002,
+                gamma=0.9,
+                batch_size=1000,
+                train_interval=4,  # Environment steps per update
+                gradient_steps=1,  # Mini-batch gradient steps per update
+                target_sync="hard",  # "hard": copy every target_update_interval gradient steps, "soft": Polyak
+                target_update_interval=1000,
+            )
+            self._learning_model.load_model("model.pth")
+            if self.training or self.resume:
+                from src.ai.checkpoint import CheckpointManager
+
+                self.checkpoints = CheckpointManager("data/checkpoints", every_games=500, every_seconds=600, keep=3)
+                self.checkpoints.resume(self._learning_model, "model.pth")
+        return self._learning_model
+
+    @property
+    def training(self):
+        # Only automated learning games train the network and write checkpoints
+        return self.mode == LEARNING_MODE and self.automate
+
+    @property
+    def board(self):
+        return self.engine.board
+
+    @property
+    def snake(self):
+        return self.engine.snake
+
+    @property
+    def food(self):
+        return self.engine.food
+
+    @property
+    def score(self):
+        return self.engine.score
+
     # -----------------
     # Data Management
     # -----------------
@@ -82,16 +165,19 @@ class Game:
     def update_position_message(self):
         #Update the message showing the snake's current head position.
         head_pos_x, head_pos_y = self.snake.head_position()
-        self.position_message = f"Snake Position: ({head_pos_x // TILE_SIZE}, {head_pos_y // TILE_SIZE})"
+        self.position_message = f"Snake Position: ({head_pos_x}, {head_pos_y})"
 
     def update_goal_position(self):
         #Update the message showing the current food's position.
+        if self.food.position is None:
+            self.goal_text = "Goal Position: board full"
+            return
         fruit_x, fruit_y = self.food.position
-        self.goal_text = f"Goal Position: ({fruit_x // TILE_SIZE}, {fruit_y // TILE_SIZE})"
+        self.goal_text = f"Goal Position: ({fruit_x}, {fruit_y})"
 
     def load_statistics(self):
         #Load statistics for each mode from separate JSON files in the data directory.
-        for mode in [NORMAL_MODE, A_STAR_MODE, LEARNING_MODE, TESTING_MODE]:
+        for mode in [NORMAL_MODE, A_STAR_MODE, LEARNING_MODE, TESTING_MODE, HAMILTONIAN_MODE]:
             filename = f"data/{mode}_stats.json"
             try:
                 with open(filename, "r") as file:
@@ -103,49 +189,32 @@ class Game:
                         self.learning_stats = json.load(file)
                     elif mode == TESTING_MODE:
                         self.testing_stats = json.load(file)
+                    elif mode == HAMILTONIAN_MODE:
+                        self.hamiltonian_stats = json.load(file)
             except (FileNotFoundError, json.JSONDecodeError):
                 print(f"{filename} not found or corrupted, using default values.")
 
-    def save_statistics(self):
-        #Save statistics for each mode to separate JSON files in the data directory.
+    def save_statistics(self, mode=None):
+        #Save statistics for one mode, or every mode, to its JSON file in the data directory.
         stats_files = {
             NORMAL_MODE: "data/normal_stats.json",
             A_STAR_MODE: "data/a_star_stats.json",
             LEARNING_MODE: "data/learning_stats.json",
             TESTING_MODE: "data/testing_stats.json",
+            HAMILTONIAN_MODE: "data/hamiltonian_stats.json",
         }
 
-        for mode, filename in stats_files.items():
+        for stats_mode, filename in stats_files.items():
+            if mode is not None and stats_mode != mode:
+                continue
             data = (
-                self.normal_stats if mode == NORMAL_MODE else
-                self.a_star_stats if mode == A_STAR_MODE else
-                self.learning_stats if mode == LEARNING_MODE else
+                self.normal_stats if stats_mode == NORMAL_MODE else
+                self.a_star_stats if stats_mode == A_STAR_MODE else
+                self.learning_stats if stats_mode == LEARNING_MODE else
+                self.hamiltonian_stats if stats_mode == HAMILTONIAN_MODE else
                 self.testing_stats
             )
-            with open(filename, "w") as file:
-                json.dump(data, file, indent=4)
-        print("Statistics saved to separate files in data directory.")
-
-    def load_run_data(self):
-        #Load run data for each mode from separate JSON files in the data directory.
-        for mode in [NORMAL_MODE, A_STAR_MODE, LEARNING_MODE]:
-            filename = f"data/{mode}_run_data.json"
-            try:
-                with open(filename, "r") as file:
-                    self.run_data[mode] = json.load(file)
-            except (FileNotFoundError, json.JSONDecodeError):
-                print(f"{filename} not found or corrupted. Resetting run data for {mode}.")
-                self.run_data[mode] = []
-
-    def save_run_data(self):
-        #Save run data for the active mode to its JSON file.
-        filename = f"data/{self.mode}_run_data.json"
-        try:
-            with open(filename, "w") as file:
-                json.dump(self.run_data[self.mode], file, indent=4)
-            print(f"Run data saved to {filename}.")
-        except Exception as e:
-            print(f"Error saving run data to {filename}: {e}")
+            save_snapshot(filename, data)
 
     def save_current_automation_stats(self):
         if self.mode == LEARNING_MODE:
@@ -171,7 +240,9 @@ class Game:
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.KEYDOWN:
-                if self.paused:
+                if event.key in SPEED_UP_KEYS + SLOW_DOWN_KEYS and self.mode != NORMAL_MODE:
+                    self.change_speed(2 if event.key in SPEED_UP_KEYS else 0.5)
+                elif self.paused:
                     if self.game_over:
                         self.reset_game()
                     else:
@@ -186,18 +257,24 @@ class Game:
                     elif event.key in (pygame.K_RIGHT, pygame.K_d):
                         self.snake.change_direction("RIGHT")
 
+    def change_speed(self, factor):
+        # Simulation ticks per rendered frame, human play always stays at 1x
+        multiplier = int(self.speed_multiplier * factor)
+        self.speed_multiplier = max(1, min(multiplier, MAX_SPEED_MULTIPLIER))
+        self.pending_ticks = 0.0
+        print(f"Simulation speed set to x{self.speed_multiplier}.")
+
     def reset_game(self):
         print("Resetting game...")
-        self.idle_timer = 0  # Reset idle timer
-        self.board = Board(WIDTH, HEIGHT, TILE_SIZE, num_walls=self.num_walls)
-        initial_position = (self.board.grid_width // 2 * TILE_SIZE, self.board.grid_height // 2 * TILE_SIZE)
-        self.snake = Snake(initial_position, TILE_SIZE)
-        self.snake.direction = None
-        self.food = Food(self.board, self.snake, TILE_SIZE)
+        seed = random.getrandbits(63)
+        self.engine.reset(seed)
+        if self.record:
+            self.recording = Recording(self.mode, seed, self.engine.width, self.engine.height, self.engine.num_walls)
+        self.a_star_planner.reset()
+        self.features.invalidate()
         self.running = True
         self.paused = not self.automate
         self.game_over = False
-        self.score = 0
         self.position_message = ""
         self.goal_text = ""
         print("Game reset successfully.")
@@ -211,9 +288,11 @@ class Game:
         print(f"Ending game #{self.current_run + 1}.")
         
         # Determine the stats based on the mode
+        stats_mode = self.mode if self.mode in (NORMAL_MODE, A_STAR_MODE, HAMILTONIAN_MODE) else LEARNING_MODE
         stats = (
-            self.normal_stats if self.mode == NORMAL_MODE else
-            self.a_star_stats if self.mode == A_STAR_MODE else
+            self.normal_stats if stats_mode == NORMAL_MODE else
+            self.a_star_stats if stats_mode == A_STAR_MODE else
+            self.hamiltonian_stats if stats_mode == HAMILTONIAN_MODE else
             self.learning_stats
         )
         
@@ -233,26 +312,33 @@ class Game:
 
         # Append the score to the scores list for the current automation
         self.scores.append(self.score)
+        self.metrics.record(self.mode, self.score)
 
         if self.mode == LEARNING_MODE and self.automate:
             self.learning_model.n_games += 1
-            # Update mean score
-            mean_score = sum(self.scores[-100:]) / min(len(self.scores), 100)
-            self.mean_scores.append(mean_score)
+            # Update mean score over the metrics window
+            self.mean_scores.append(self.metrics.scores(self.mode).mean())
 
             # Decay epsilon
             self.learning_model.decay_epsilon()
             print(f"Epsilon decayed to {self.learning_model.epsilon:.4f}")
+            self.checkpoints.maybe_save(self.learning_model)
         
         elif self.mode == TESTING_MODE:
             # Log testing progress
             print(f"Testing mode: Game {self.current_run + 1} completed with score: {self.score}")
 
         # Log run data (run number and score)
+        started = self.profiler.start()
         run_info = {"run": stats["runs"], "score": self.score}
-        self.run_data[self.mode].append(run_info)
-        self.save_run_data()
-        self.save_statistics()
+        self.run_stores[self.mode].append(run_info)
+        self.save_statistics(stats_mode)
+        if self.recording is not None:
+            self.recording.mode = self.mode  # The mode can be switched after reset, e.g. by main.py
+            self.recording.run = stats["runs"]
+            self.recording.score = self.score
+            self.recording_stores[self.mode].append(self.recording)
+        self.profiler.stop("persistence", started)
 
         if self.automate:
             self.current_run += 1
@@ -260,7 +346,15 @@ class Game:
                 self.reset_game()
             else:
                 print(f"[AUTOMATION] Completed {self.max_runs} runs.")
+                print(self.metrics.report(self.mode))
+                if self.mode == LEARNING_MODE:
+                    scheduler = self.learning_model.scheduler
+                    print(f"[TRAINING] {scheduler.env_steps} env steps, {scheduler.updates} gradient steps, "
+                          f"{scheduler.samples} samples, {scheduler.target_syncs} target syncs.")
                 self.save_current_automation_stats()
+                if self.profiler.enabled:
+                    self.update_profile_counters()
+                    self.profiler.dump(f"data/{self.mode}_profile.json")
                 if self.mode == LEARNING_MODE:
                     plot(
                         self.scores,
@@ -280,172 +374,205 @@ class Game:
         # Prevent any updates if the game is over or paused
         if self.paused or self.game_over:
             return
-        
-        self.idle_timer += 1
 
-        if self.idle_timer > self.max_idle_ticks:
-            print(f"Ending game due to inactivity. Idle timer exceeded {self.max_idle_ticks} ticks.")
+        if self.engine.tick():
+            print(f"Ending game due to inactivity. Idle timer exceeded {self.engine.max_idle_ticks} ticks.")
             self.end_game()
             return
 
+        self.profiler.tick()
+        transition = None  # Learning transition waiting for the done flag from resolve()
+        direction = None  # NORMAL_MODE keeps the direction set by handle_input
+
         if self.mode == LEARNING_MODE:
+            started = self.profiler.start()
+            current_state = self.features.state(self.snake, self.food, self.board)
             if self.automate:
                 # Automated learning logic
-                current_state = self.learning_model.get_state(self.snake, self.food, self.board)
                 action = self.learning_model.choose_action(current_state)
-                self.snake.change_direction(["UP", "DOWN", "LEFT", "RIGHT"][action])
-                self.snake.move()
-
-                reward = self.learning_model.get_reward(self.snake, self.food, self.board)
-                next_state = self.learning_model.get_state(self.snake, self.food, self.board)
-
-                self.learning_model.train_step([current_state], [action], [reward], [next_state], [self.game_over])
-                self.learning_model.remember(current_state, action, reward, next_state, self.game_over)
-
-                if self.snake.head_position() == self.food.position:
-                    self.score += 1
-                    self.snake.grow()
-                    self.food.position = self.food.spawn(self.snake.body)
-                elif not self.board.is_within_bounds(self.snake.head_position()) or self.snake.has_collision(self.board):
-                    self.end_game()
-
             else:
                 # Non-automated behavior
-                current_state = self.learning_model.get_state(self.snake, self.food, self.board)
                 action = self.learning_model.choose_action(current_state, epsilon=0.0)  # Exploit only
-                self.snake.change_direction(["UP", "DOWN", "LEFT", "RIGHT"][action])
-                self.snake.move()
-
-                if not self.board.is_within_bounds(self.snake.head_position()) or self.snake.has_collision(self.board):
-                    if not self.game_over:  # Avoid multiple calls
-                        self.end_game()
-                elif self.snake.head_position() == self.food.position:
-                    self.score += 1
-                    self.snake.grow()
-                    self.food.position = self.food.spawn(self.snake.body)
-                    self.idle_timer = 0
+            direction = DIRECTIONS[action]
+            self.profiler.stop("inference", started)
 
         elif self.mode == A_STAR_MODE:
-            a_star_move(self.snake, self.food, self.board)
+            started = self.profiler.start()
+            a_star_steer(self.snake, self.food, self.board, self.a_star_planner)
+            self.profiler.stop("planning", started)
+
+        elif self.mode == HAMILTONIAN_MODE:
+            # Boards whose walls leave no Hamiltonian cycle are played with A* instead
+            started = self.profiler.start()
+            hamiltonian_steer(self.snake, self.food, self.board, self.hamiltonian_planner,
+                              fallback=lambda snake, food, board: a_star_steer(snake, food, board, self.a_star_planner))
+            self.profiler.stop("planning", started)
 
         elif self.mode == TESTING_MODE:
-            current_state = self.learning_model.get_state(self.snake, self.food, self.board)
+            started = self.profiler.start()
+            current_state = self.features.state(self.snake, self.food, self.board)
             action = self.learning_model.choose_action(current_state, epsilon=0.0)  # No exploration
-            self.snake.change_direction(["UP", "DOWN", "LEFT", "RIGHT"][action])
-            self.snake.move()
-
-            if not self.board.is_within_bounds(self.snake.head_position()) or self.snake.has_collision(self.board):
-                self.end_game()
-            if self.snake.head_position() == self.food.position:
-                self.score += 1
-                self.snake.grow()
-                self.food.position = self.food.spawn(self.snake.body)
-
-        else:  # NORMAL_MODE
-            self.snake.move()
+            direction = DIRECTIONS[action]
+            self.profiler.stop("inference", started)
+
+        # Movement, food and collision handling for all modes. The learning transition's reward and
+        # next state have to be taken between move and resolve, so they count towards this phase.
+        started = self.profiler.start()
+        self.engine.move(direction)
+        if self.recording is not None:
+            self.recording.record(self.snake.direction)
+        if self.mode == LEARNING_MODE and self.automate:
+            next_state, reward = self.features.after_move(self.snake, self.food, self.board)
+            transition = (current_state, action, reward, next_state)
+        ate_food = self.engine.resolve()
+        self.profiler.stop("movement", started)
+        if ate_food and (self.mode == HAMILTONIAN_MODE or (self.mode == LEARNING_MODE and not self.automate)):
+            self.engine.idle_timer = 0  # Filling the board takes far more than max_idle_ticks
+
+        # The next state from after_move stays valid only if resolve() left snake and food as they were
+        if transition is None or ate_food or self.engine.done:
+            self.features.invalidate()
+
+        # Store the experience and train from replay on the model's mini-batch schedule
+        if transition is not None:
+            started = self.profiler.start()
+            self.learning_model.remember(*transition, self.engine.done)
+            self.learning_model.train_on_schedule()
+            self.profiler.stop("training", started)
 
         # Update display messages
         self.update_position_message()
         self.update_goal_position()
 
-        # Collision handling for all modes
-        if self.snake.head_position() == self.food.position:
-            self.score += 1
-            self.snake.grow()
-            self.food.position = self.food.spawn(self.snake.body)
-        elif not self.board.is_within_bounds(self.snake.head_position()) or self.snake.has_collision(self.board):
+        if self.engine.done:
             self.end_game()
 
 
     def render(self):
-        # Draw the game board
-        for row in range(0, HEIGHT, TILE_SIZE):
-            for col in range(0, WIDTH, TILE_SIZE):
-                color = COLOR_LIGHT if (row // TILE_SIZE + col // TILE_SIZE) % 2 == 0 else COLOR_DARK
-                pygame.draw.rect(self.window, color, (col, row, TILE_SIZE, TILE_SIZE))
-        
-        #draw walls
-        self.board.draw(self.window)
-
-        # Draw the snake and food
-        self.snake.draw(self.window)
-        self.food.draw(self.window)
-
-        # Draw the side log area
-        pygame.draw.rect(self.window, COLOR_BACKGROUND, (WIDTH, 0, LOG_WIDTH, HEIGHT))
-
-        # Display score
-        score_text = self.font.render(f"Score: {self.score}", True, COLOR_TEXT)
-        self.window.blit(score_text, (WIDTH + 10, 10))
-
-        # Display position and goal messages
-        position_text = self.font.render(self.position_message, True, COLOR_TEXT)
-        self.window.blit(position_text, (WIDTH + 10, 40))
-
-        goal_text = self.font.render(self.goal_text, True, COLOR_TEXT)
-        self.window.blit(goal_text, (WIDTH + 10, 60))
-
         # Display statistics
         stats = (
             self.normal_stats if self.mode == NORMAL_MODE else
             self.a_star_stats if self.mode == A_STAR_MODE else
+            self.hamiltonian_stats if self.mode == HAMILTONIAN_MODE else
             self.learning_stats
         )
         average_score = stats["total_score"] / stats["runs"] if stats["runs"] > 0 else 0
 
-        runs_text = self.font.render(f"Runs: {stats['runs']}", True, COLOR_TEXT)
-        highest_score_text = self.font.render(f"Highest Score: {stats['highest_score']}", True, COLOR_TEXT)
-        last_score_text = self.font.render(f"Last Score: {stats['last_score']}", True, COLOR_TEXT)
-        average_score_text = self.font.render(f"Average Score: {average_score:.2f}", True, COLOR_TEXT)
-
-        self.window.blit(runs_text, (WIDTH + 10, 80))
-        self.window.blit(highest_score_text, (WIDTH + 10, 100))
-        self.window.blit(last_score_text, (WIDTH + 10, 120))
-        self.window.blit(average_score_text, (WIDTH + 10, 140))
-
-        # Display the event log
+        # Side log area: score, position and goal messages, statistics, then the event log
+        panel_lines = [
+            (10, f"Score: {self.score}"),
+            (40, self.position_message),
+            (60, self.goal_text),
+            (80, f"Runs: {stats['runs']}"),
+            (100, f"Highest Score: {stats['highest_score']}"),
+            (120, f"Last Score: {stats['last_score']}"),
+            (140, f"Average Score: {average_score:.2f}"),
+        ]
         y_offset = 160
+        for line in self.metrics.panel_lines(self.mode):
+            panel_lines.append((y_offset, line))
+            y_offset += 20
+        if self.mode != NORMAL_MODE:
+            panel_lines.append((y_offset, f"Speed: x{self.speed_multiplier} (+/-)"))
+            y_offset += 20
+        if self.mode == LEARNING_MODE and self._learning_model is not None:
+            rates = self.learning_model.scheduler.rates(min_interval=1.0)
+            panel_lines.append((y_offset, f"Updates/sec: {rates['updates_per_second']:.1f}"))
+            panel_lines.append((y_offset + 20, f"Samples/sec: {rates['samples_per_second']:.0f}"))
+            y_offset += 40
+        if self.profiler.enabled:
+            self.update_profile_counters()
+            for line in self.profiler.panel_lines():
+                panel_lines.append((y_offset, line))
+                y_offset += 20
         for log in self.logs:
-            log_text = self.font.render(log, True, COLOR_TEXT)
-            self.window.blit(log_text, (WIDTH + 10, y_offset))
+            panel_lines.append((y_offset, log))
             y_offset += 20
 
         # Display pause messages
+        overlay = None
         if self.paused:
-            pause_text = (
-                self.font.render("Press any key to restart", True, COLOR_TEXT)
-                if self.game_over else
-                self.font.render("Use W A S D or Arrow Keys to start", True, COLOR_TEXT)
-            )
-            self.window.blit(pause_text, (WIDTH // 2 - pause_text.get_width() // 2, HEIGHT // 2))
+            overlay = "Press any key to restart" if self.game_over else "Use W A S D or Arrow Keys to start"
+
+        self.renderer.draw(self.board, self.snake, self.food, panel_lines, overlay)
 
-        # Update the display
-        pygame.display.flip()
+    def update_profile_counters(self):
+        # Planner totals are kept by the planner itself, copy them over for display and dumps
+        self.profiler.counters["A* searches"] = self.a_star_planner.searches
+        self.profiler.counters["A* expansions"] = self.a_star_planner.expansions
+        self.profiler.counters["Flood fills"] = self.a_star_planner.flood_fills
+        self.profiler.counters["Cycle shortcuts"] = self.hamiltonian_planner.shortcuts
+        if self._learning_model is not None:
+            self.profiler.counters["Gradient steps"] = self.learning_model.scheduler.updates
+            self.profiler.counters["Target syncs"] = self.learning_model.scheduler.target_syncs
 
     def run(self):
         print("Starting game loop...")
         try:
             while self.running:
+                if self.headless:
+                    # No display: step the simulation as fast as the CPU allows
+                    self.update()
+                    continue
+
+                started = self.profiler.start()
                 self.handle_input()
-                self.update()
+                self.profiler.stop("input", started)
+
+                self.run_ticks()
+
+                started = self.profiler.start()
                 self.render()
+                self.profiler.stop("render", started)
 
                 if self.mode == LEARNING_MODE and self.game_over:
                     self.end_game()
 
-                self.clock.tick(SNAKE_SPEED)
+                self.frame_time = self.clock.tick(SNAKE_SPEED)
 
             # Wait for user input before closing
-            if (self.automate):
+            if self.automate and not self.headless:
                 print("Automation completed. Press any key or click to close.")
                 self.wait_for_close()
 
         except Exception as e:
             print(f"An error occurred: {e}")
         finally:
-            pygame.quit()
-            if self.mode == LEARNING_MODE:
+            if not self.headless:
+                pygame.quit()
+            if self.mode == LEARNING_MODE and self._learning_model is not None:
                 self.learning_model.save_model()
+                if self.training:
+                    self.checkpoints.save_final(self.learning_model)
+            self.close()
+
+    def close(self):
+        # Stop the background metrics and checkpoint threads once their pending writes are on disk.
+        # Their paths are relative, so call this before changing the working directory.
+        self.metrics.close()
+        if self.checkpoints is not None:
+            self.checkpoints.close()
+
+    def run_ticks(self):
+        # Fixed timestep: at 1x exactly one tick per frame, as before. When fast-forwarding the
+        # owed ticks follow real elapsed time and only the last state of the frame gets rendered.
+        if self.speed_multiplier == 1:
+            self.update()
+            return
+
+        self.pending_ticks += self.frame_time * SNAKE_SPEED * self.speed_multiplier / 1000
+        ticks = int(self.pending_ticks)
+        self.pending_ticks -= ticks
+
+        deadline = time.perf_counter() + 1 / SNAKE_SPEED
+        for _ in range(ticks):
+            self.update()
+            if not self.running or self.paused:
+                break
+            if time.perf_counter() > deadline:
+                # Can't keep up at this multiplier, drop the backlog instead of spiralling
+                self.pending_ticks = 0.0
+                break
 
     def wait_for_close(self):
         #Wait for the user to press a key or click before closing.
@@ -476,22 +603,15 @@ class Game:
             print(f"Testing game #{test_run + 1}...")
             self.reset_game()
 
-            while not self.game_over:
+            while not self.engine.done:
                 # Get the current state
-                current_state = self.learning_model.get_state(self.snake, self.food, self.board)
+                current_state = self.features.state(self.snake, self.food, self.board)
                 # Choose the best action (exploit)
                 action = self.learning_model.choose_action(current_state, epsilon=test_epsilon)
-                # Perform the action
-                self.snake.change_direction(["UP", "DOWN", "LEFT", "RIGHT"][action])
-                self.snake.move()
-
-                # Check collisions or food
-                if not self.board.is_within_bounds(self.snake.head_position()) or self.snake.has_collision(self.board):
-                    break  # Game over
-                if self.snake.head_position() == self.food.position:
-                    self.score += 1
-                    self.snake.grow()
-                    self.food.position = self.food.spawn(self.snake.body)
+                # Perform the action, then check collisions or food
+                self.engine.move(DIRECTIONS[action])
+                self.engine.resolve()
+                self.features.invalidate()
 
             # Update metrics
             total_score += self.score
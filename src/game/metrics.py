@@ -0,0 +1,167 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+METRICS_WINDOW = 100  # Runs covered by the windowed statistics
+FLUSH_INTERVAL = 5.0  # Seconds between snapshot writes
+PERCENTILES = (0.5, 0.9, 0.99)
+
+class WindowedScores:
+    # Scores of the last window runs of one mode plus all-time totals, every add is O(1):
+    # a running sum for the mean, a monotonic deque for the max and a count per score value for
+    # percentiles. Scores are small non-negative integers, so percentile queries scan the counts.
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self.scores = deque()
+        self.window_total = 0
+        self.maxima = deque()  # (index, score) with decreasing scores, the front is the window max
+        self.counts = []  # Runs in the window per score value
+        self.runs = 0
+        self.total = 0
+        self.highest = 0
+        self.last = 0
+
+    def add(self, score):
+        score = max(0, int(score))
+        self.scores.append(score)
+        self.window_total += score
+        while self.maxima and self.maxima[-1][1] <= score:
+            self.maxima.pop()
+        self.maxima.append((self.runs, score))
+        if score >= len(self.counts):
+            self.counts.extend([0] * (score + 1 - len(self.counts)))
+        self.counts[score] += 1
+
+        if len(self.scores) > self.window:
+            evicted = self.scores.popleft()
+            self.window_total -= evicted
+            self.counts[evicted] -= 1
+        if self.maxima[0][0] <= self.runs - self.window:
+            self.maxima.popleft()
+
+        self.runs += 1
+        self.total += score
+        self.highest = max(self.highest, score)
+        self.last = score
+
+    def mean(self):
+        return self.window_total / len(self.scores) if self.scores else 0.0
+
+    def max(self):
+        return self.maxima[0][1] if self.maxima else 0
+
+    def percentile(self, fraction):
+        # Nearest-rank percentile of the window
+        if not self.scores:
+            return 0
+        rank = max(1, math.ceil(round(fraction * len(self.scores), 6)))  # round: 0.9 * 100 is 90.00000000000001
+        seen = 0
+        for score, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return score
+        return self.max()
+
+    def summary(self):
+        return {
+            "runs": self.runs,
+            "mean": round(self.total / self.runs, 4) if self.runs else 0.0,
+            "highest": self.highest,
+            "last": self.last,
+            "window": {
+                "runs": len(self.scores),
+                "mean": round(self.mean(), 4),
+                "max": self.max(),
+                **{f"p{round(fraction * 100)}": self.percentile(fraction) for fraction in PERCENTILES},
+            },
+        }
+
+class MetricsAggregator:
+    # Live per-mode score statistics of this process. Game records every finished run here and
+    # reads the panel and report lines back; a background thread writes a JSON snapshot every
+    # flush_interval seconds when something changed, so the game loop never touches the disk.
+    def __init__(self, path="data/live_metrics.json", window=METRICS_WINDOW, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.window = window
+        self.flush_interval = flush_interval
+        self.modes = {}
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.flush_loop, name="metrics-flush", daemon=True)
+            self.thread.start()
+
+    def close(self):
+        # Stop the flush thread and write the final snapshot
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+    def record(self, mode, score):
+        with self.lock:
+            if mode not in self.modes:
+                self.modes[mode] = WindowedScores(self.window)
+            self.modes[mode].add(score)
+            self.dirty = True
+
+    def scores(self, mode):
+        # Window statistics of a mode, an empty one if it has no runs yet
+        return self.modes.get(mode) or WindowedScores(self.window)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "updated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "seconds": round(time.time() - self.started_at, 1),
+                "modes": {mode: scores.summary() for mode, scores in self.modes.items()},
+            }
+
+    def flush(self):
+        if not self.dirty:
+            return
+        self.dirty = False
+        snapshot = self.snapshot()
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w") as file:
+                json.dump(snapshot, file, indent=4)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            self.dirty = True
+            print(f"Error saving live metrics: {e}")
+
+    def flush_loop(self):
+        while not self.stopped.wait(self.flush_interval):
+            self.flush()
+
+    def panel_lines(self, mode):
+        scores = self.scores(mode)
+        if not scores.runs:
+            return []
+        return [
+            f"Last {len(scores.scores)}: mean {scores.mean():.2f}, max {scores.max()}",
+            f"p50/p90/p99: {scores.percentile(0.5)}/{scores.percentile(0.9)}/{scores.percentile(0.99)}",
+        ]
+
+    def report(self, mode):
+        # End-of-automation summary of a mode
+        summary = self.scores(mode).summary()
+        window = summary["window"]
+        return (
+            f"[METRICS] {mode}: {summary['runs']} runs, mean {summary['mean']:.2f}, highest {summary['highest']}. "
+            f"Last {window['runs']}: mean {window['mean']:.2f}, max {window['max']}, "
+            f"p50 {window['p50']}, p90 {window['p90']}, p99 {window['p99']}"
+        )
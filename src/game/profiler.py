@@ -0,0 +1,103 @@
+import json
+import math
+import time
+
+BUCKETS_PER_OCTAVE = 4  # Histogram resolution: each bucket spans a factor of 2 ** (1 / 4) ~ 19%
+NUM_BUCKETS = 40 * BUCKETS_PER_OCTAVE  # Up to 2 ** 40 ns, about 18 minutes
+
+class PhaseHistogram:
+    # Log-bucketed durations in nanoseconds, exact count/total/max and approximate percentiles
+    def __init__(self):
+        self.buckets = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, elapsed):
+        index = int(math.log2(elapsed) * BUCKETS_PER_OCTAVE) if elapsed > 1 else 0
+        self.buckets[min(index, NUM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def percentile(self, fraction):
+        # Upper edge of the bucket holding the given fraction of samples, in nanoseconds
+        if not self.count:
+            return 0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank:
+                return min(2 ** ((index + 1) / BUCKETS_PER_OCTAVE), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total / 1e6, 4),
+            "mean_ms": round(self.total / self.count / 1e6, 4) if self.count else 0,
+            "p50_ms": round(self.percentile(0.5) / 1e6, 4),
+            "p99_ms": round(self.percentile(0.99) / 1e6, 4),
+            "max_ms": round(self.max / 1e6, 4),
+        }
+
+class PhaseProfiler:
+    # Opt-in timing of the Game loop phases. Usage:
+    #   started = profiler.start()
+    #   ...phase...
+    #   profiler.stop("render", started)
+    # When disabled start() returns None and stop() returns straight away, so the hooks can stay
+    # in the loop permanently. Counters hold totals such as planner node expansions.
+    PHASES = ("input", "planning", "inference", "training", "movement", "render", "persistence")
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.histograms = {phase: PhaseHistogram() for phase in self.PHASES}
+        self.counters = {}
+        self.ticks = 0
+        self.started_at = time.perf_counter()
+
+    def start(self):
+        return time.perf_counter_ns() if self.enabled else None
+
+    def stop(self, phase, started):
+        if started is not None:
+            self.histograms[phase].add(time.perf_counter_ns() - started)
+
+    def tick(self):
+        self.ticks += 1
+
+    def ticks_per_second(self):
+        elapsed = time.perf_counter() - self.started_at
+        return self.ticks / elapsed if elapsed > 0 else 0
+
+    def summary(self):
+        return {
+            "ticks": self.ticks,
+            "ticks_per_second": round(self.ticks_per_second(), 1),
+            "phases": {phase: histogram.summary() for phase, histogram in self.histograms.items() if histogram.count},
+            "counters": dict(self.counters),
+        }
+
+    def panel_lines(self):
+        # Short lines for the side panel: ticks/sec, p50/p99 per phase that has run, counters
+        lines = [f"Ticks/sec: {self.ticks_per_second():.0f}"]
+        for phase, histogram in self.histograms.items():
+            if histogram.count:
+                lines.append(f"{phase}: {histogram.percentile(0.5) / 1e6:.2f}/{histogram.percentile(0.99) / 1e6:.2f} ms")
+        for name, value in self.counters.items():
+            lines.append(f"{name}: {value}")
+        return lines
+
+    def dump(self, filename):
+        try:
+            with open(filename, "w") as file:
+                json.dump(self.summary(), file, indent=4)
+            print(f"Profile saved to {filename}.")
+        except Exception as e:
+            print(f"Error saving profile: {e}")
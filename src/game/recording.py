@@ -0,0 +1,184 @@
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+
+from config.settings import *
+from src.game.engine import GameEngine
+
+# Binary game recordings: an engine seed plus 2 bits per tick for the snake's direction.
+# Walls and food come from the seeded engine, so seed + directions re-simulate the game exactly.
+# A file is a sequence of records, each a fixed header followed by the packed directions.
+
+MAGIC = b"SNKR"
+VERSION = 1
+MODES = (NORMAL_MODE, A_STAR_MODE, LEARNING_MODE, TESTING_MODE, HAMILTONIAN_MODE)  # Append only, stored by index
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+DIRECTION_INDEX = {direction: index for index, direction in enumerate(DIRECTIONS)}
+
+# magic, version, mode, run, width, height, num_walls, seed, idle_prefix, num_actions, score
+HEADER = struct.Struct("<4sBBIHHHQIII")
+
+class Recording:
+    # One game: the engine setup, the ticks spent waiting before the snake first moved
+    # (idle_prefix) and the direction index of every tick after that
+    def __init__(self, mode, seed, width, height, num_walls, run=0, score=0, idle_prefix=0, actions=None):
+        self.mode = mode
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.num_walls = num_walls
+        self.run = run
+        self.score = score
+        self.idle_prefix = idle_prefix
+        self.actions = actions if actions is not None else bytearray()
+
+    def __len__(self):
+        return self.idle_prefix + len(self.actions)
+
+    def record(self, direction):
+        # Direction the snake moved in this tick, None while it has not started moving
+        if direction is None:
+            self.idle_prefix += 1
+        else:
+            self.actions.append(DIRECTION_INDEX[direction])
+
+    def directions(self):
+        return [DIRECTIONS[action] for action in self.actions]
+
+    def pack(self):
+        actions = np.frombuffer(bytes(self.actions), dtype=np.uint8)
+        padded = np.zeros(-(-len(actions) // 4) * 4, dtype=np.uint8)
+        padded[:len(actions)] = actions
+        quads = padded.reshape(-1, 4)
+        packed = quads[:, 0] | (quads[:, 1] << 2) | (quads[:, 2] << 4) | (quads[:, 3] << 6)
+
+        header = HEADER.pack(
+            MAGIC, VERSION, MODES.index(self.mode), self.run, self.width, self.height,
+            self.num_walls, self.seed, self.idle_prefix, len(self.actions), self.score,
+        )
+        return header + packed.tobytes()
+
+    @classmethod
+    def unpack_from(cls, data, offset=0):
+        # Returns (recording, offset of the next record)
+        magic, version, mode, run, width, height, num_walls, seed, idle_prefix, num_actions, score = (
+            HEADER.unpack_from(data, offset)
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} game recording at byte {offset}.")
+
+        offset += HEADER.size
+        size = -(-num_actions // 4)
+        packed = np.frombuffer(data, dtype=np.uint8, count=size, offset=offset)
+        quads = np.stack([packed & 3, (packed >> 2) & 3, (packed >> 4) & 3, packed >> 6], axis=1)
+        actions = bytearray(quads.reshape(-1)[:num_actions].tobytes())
+
+        recording = cls(MODES[mode], seed, width, height, num_walls, run, score, idle_prefix, actions)
+        return recording, offset + size
+
+class RecordingStore:
+    # Append-only file of recordings for one mode, read back on demand
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, recording):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "ab") as file:
+            file.write(recording.pack())
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as file:
+            data = file.read()
+
+        recordings = []
+        offset = 0
+        while offset < len(data):
+            try:
+                recording, offset = Recording.unpack_from(data, offset)
+            except (ValueError, struct.error):
+                print(f"Skipping truncated or corrupted data at the end of {self.path}.")
+                break
+            recordings.append(recording)
+        return recordings
+
+def replay(recording, on_tick=None):
+    # Re-simulate a recording headlessly, on_tick(engine) runs after every tick, e.g. to render.
+    # The game ends where the recording ends, so the engine's own idle limit is switched off.
+    engine = GameEngine(recording.width, recording.height, num_walls=recording.num_walls,
+                        max_idle_ticks=float("inf"), seed=recording.seed)
+
+    for direction in [None] * recording.idle_prefix + recording.directions():
+        engine.step(direction)
+        if on_tick is not None:
+            on_tick(engine)
+        if engine.done:
+            break
+    return engine
+
+def replay_rendered(recording, speed=1):
+    # Replay in a window at speed times the normal game speed
+    import pygame
+    from src.game.renderer import Renderer
+
+    pygame.init()
+    window = pygame.display.set_mode((WIDTH + LOG_WIDTH, HEIGHT))
+    pygame.display.set_caption(f"Snake Replay - {recording.mode} run {recording.run}")
+    renderer = Renderer(window, pygame.font.SysFont("Arial", 18))
+    clock = pygame.time.Clock()
+    ticks = 0
+
+    def draw(engine):
+        nonlocal ticks
+        ticks += 1
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                raise KeyboardInterrupt
+        if ticks % max(1, int(speed)) == 0 or engine.done:
+            renderer.draw(engine.board, engine.snake, engine.food, [
+                (10, f"Score: {engine.score}"),
+                (40, f"Run: {recording.run} ({recording.mode})"),
+                (60, f"Tick: {ticks}/{len(recording)}"),
+                (80, f"Final Score: {recording.score}"),
+            ])
+            clock.tick(SNAKE_SPEED * min(speed, 1))
+
+    try:
+        engine = replay(recording, on_tick=draw)
+        time.sleep(1)
+    except KeyboardInterrupt:
+        engine = None
+    finally:
+        pygame.quit()
+    return engine
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List or replay recorded games.")
+    parser.add_argument("path", help="recording file, e.g. data/a_star_recordings.bin")
+    parser.add_argument("--run", type=int, help="run number to replay")
+    parser.add_argument("--best", action="store_true", help="replay the highest scoring game")
+    parser.add_argument("--render", action="store_true", help="show the replay in a window")
+    parser.add_argument("--speed", type=float, default=1, help="replay speed multiplier when rendering")
+    args = parser.parse_args()
+
+    recordings = RecordingStore(args.path).load()
+    if args.best and recordings:
+        selected = [max(recordings, key=lambda recording: recording.score)]
+    elif args.run is not None:
+        selected = [recording for recording in recordings if recording.run == args.run]
+    else:
+        for recording in recordings:
+            print(f"Run {recording.run}: score {recording.score}, {len(recording)} ticks, seed {recording.seed}")
+        selected = []
+
+    for recording in selected:
+        engine = replay_rendered(recording, args.speed) if args.render else replay(recording)
+        if engine is not None:
+            status = "matches" if engine.score == recording.score else "DOES NOT match"
+            print(f"Run {recording.run}: replayed score {engine.score} {status} recorded score {recording.score}.")
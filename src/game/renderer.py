@@ -0,0 +1,130 @@
+import pygame
+
+from config.settings import *
+
+COLOR_WALL = (128, 128, 128)
+PANEL_LINE_HEIGHT = 20
+TEXT_CACHE_LIMIT = 512
+
+class Renderer:
+    # Draws the game with as little work per frame as possible:
+    #   - the checkerboard and walls are baked into one surface whenever the board changes,
+    #   - text surfaces are cached by string,
+    #   - only cells and side panel lines that changed since the last frame are redrawn and
+    #     pushed to the display with pygame.display.update(dirty_rects).
+    def __init__(self, window, font):
+        self.window = window
+        self.font = font
+        self.text_cache = {}
+        self.board = None  # Board the background was baked for
+        self.cell_size = 1  # Pixels per board cell, fitted to the play area when baking
+        self.background = None
+        self.painted = {}  # Board position -> color currently drawn over the background
+        self.panel = {}  # Panel line y offset -> text currently drawn
+        self.overlay = None
+        self.needs_full_redraw = True
+
+    def invalidate(self):
+        self.needs_full_redraw = True
+
+    def text(self, string):
+        surface = self.text_cache.get(string)
+        if surface is None:
+            if len(self.text_cache) >= TEXT_CACHE_LIMIT:
+                self.text_cache.clear()
+            surface = self.font.render(string, True, COLOR_TEXT)
+            self.text_cache[string] = surface
+        return surface
+
+    def bake_background(self, board):
+        # Checkerboard plus walls, drawn once per board
+        self.cell_size = max(1, min(WIDTH // board.width, HEIGHT // board.height))
+        self.background = pygame.Surface((WIDTH, HEIGHT))
+        self.background.fill(COLOR_BACKGROUND)
+        for y in range(board.height):
+            for x in range(board.width):
+                color = COLOR_LIGHT if (x + y) % 2 == 0 else COLOR_DARK
+                self.background.fill(color, self.cell_rect((x, y)))
+        for wall in board.walls:
+            self.background.fill(COLOR_WALL, self.cell_rect(wall))
+
+        self.board = board
+        self.needs_full_redraw = True
+
+    def cell_rect(self, position):
+        # Pixel rectangle of a board cell
+        return pygame.Rect(position[0] * self.cell_size, position[1] * self.cell_size, self.cell_size, self.cell_size)
+
+    def draw(self, board, snake, food, panel_lines, overlay=None):
+        # panel_lines is a list of (y, text) for the side panel, overlay an optional centered message
+        if board is not self.board:
+            self.bake_background(board)
+        if overlay != self.overlay:
+            self.overlay = overlay
+            self.needs_full_redraw = True
+
+        full_redraw = self.needs_full_redraw
+        if full_redraw:
+            self.window.blit(self.background, (0, 0))
+            pygame.draw.rect(self.window, COLOR_BACKGROUND, (WIDTH, 0, LOG_WIDTH, HEIGHT))
+            self.painted = {}
+            self.panel = {}
+
+        dirty = self.draw_cells(snake, food)
+        dirty += self.draw_panel(panel_lines)
+
+        if full_redraw:
+            if self.overlay:
+                overlay_text = self.text(self.overlay)
+                self.window.blit(overlay_text, (WIDTH // 2 - overlay_text.get_width() // 2, HEIGHT // 2))
+            pygame.display.flip()
+            self.needs_full_redraw = False
+        elif dirty:
+            pygame.display.update(dirty)
+
+    def draw_cells(self, snake, food):
+        # Repaint only cells whose contents changed: typically the old tail, the new head and the food
+        wanted = {position: COLOR_SNAKE for position in snake.body if self.board.is_within_bounds(position)}
+        if food.position:
+            wanted[food.position] = COLOR_FOOD
+
+        dirty = []
+        for position in [position for position in self.painted if position not in wanted]:
+            rect = self.cell_rect(position)
+            self.window.blit(self.background, rect, rect)
+            del self.painted[position]
+            dirty.append(rect)
+
+        for position, color in wanted.items():
+            if self.painted.get(position) != color:
+                rect = self.cell_rect(position)
+                self.window.fill(color, rect)
+                self.painted[position] = color
+                dirty.append(rect)
+        return dirty
+
+    def draw_panel(self, panel_lines):
+        # Each line owns a horizontal band of the panel, only bands whose text changed are redrawn
+        dirty = []
+        offsets = [y for y, _ in panel_lines]
+        for index, (y, text) in enumerate(panel_lines):
+            if self.panel.get(y) == text:
+                continue
+            height = offsets[index + 1] - y if index + 1 < len(offsets) else PANEL_LINE_HEIGHT
+            dirty.append(self.draw_panel_band(y, height, text))
+            self.panel[y] = text
+
+        # Clear lines that are no longer shown, e.g. when the event log shrinks
+        for y in [y for y in self.panel if y not in offsets]:
+            dirty.append(self.draw_panel_band(y, PANEL_LINE_HEIGHT, None))
+            del self.panel[y]
+        return dirty
+
+    def draw_panel_band(self, y, height, text):
+        band = pygame.Rect(WIDTH, y, LOG_WIDTH, height)
+        self.window.set_clip(band)
+        self.window.fill(COLOR_BACKGROUND, band)
+        if text:
+            self.window.blit(self.text(text), (WIDTH + 10, y))
+        self.window.set_clip(None)
+        return band
@@ -0,0 +1,71 @@
+import json
+import os
+
+from config.settings import *
+
+class RunStore:
+    # Append-only JSON Lines log of run records for one mode.
+    # Each run costs one short line append instead of rewriting the whole history.
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.migrated = False  # Legacy data is converted on first append or load, not at startup
+
+    def migrate(self):
+        # One-time conversion of a legacy JSON array file, skipped once the JSON Lines file exists
+        if self.migrated:
+            return
+        self.migrated = True
+        if os.path.exists(self.path) or not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+
+        try:
+            with open(self.legacy_path, "r") as file:
+                records = json.load(file)
+        except json.JSONDecodeError:
+            print(f"{self.legacy_path} is corrupted, starting {self.path} empty.")
+            records = []
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+        os.replace(temp_path, self.path)
+        print(f"Migrated {len(records)} runs from {self.legacy_path} to {self.path}.")
+
+    def append(self, record):
+        self.migrate()
+        with open(self.path, "a") as file:
+            file.write(json.dumps(record) + "\n")
+
+    def iter_records(self):
+        # Stream the records one at a time, skipping a partially written last line left by a crash
+        self.migrate()
+        try:
+            with open(self.path, "r") as file:
+                for line in file:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"Skipping malformed line in {self.path}.")
+        except FileNotFoundError:
+            pass
+
+def iter_runs(filename):
+    # Run records from either a JSON Lines store (streamed) or a legacy JSON array file
+    if filename.endswith(".jsonl"):
+        return RunStore(filename).iter_records()
+    with open(filename, "r") as file:
+        return iter(json.load(file))
+
+def save_snapshot(filename, data):
+    # Small stats files are rewritten in place as a single compact line
+    with open(filename, "w") as file:
+        json.dump(data, file)
+
+def migrate_all(modes=(NORMAL_MODE, A_STAR_MODE, LEARNING_MODE, TESTING_MODE, HAMILTONIAN_MODE), data_dir="data"):
+    for mode in modes:
+        RunStore(f"{data_dir}/{mode}_run_data.jsonl", legacy_path=f"{data_dir}/{mode}_run_data.json").migrate()
+
+if __name__ == "__main__":
+    migrate_all()
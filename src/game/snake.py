@@ -1,10 +1,19 @@
-import pygame
-from src.game.board import *
+from collections import deque
+
+TURN_LEFT = {"UP": "LEFT", "DOWN": "RIGHT", "LEFT": "DOWN", "RIGHT": "UP"}
+TURN_RIGHT = {"UP": "RIGHT", "DOWN": "LEFT", "LEFT": "UP", "RIGHT": "DOWN"}
+DIRECTION_OFFSETS = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
 
 class Snake:
-    def __init__(self, initial_position, tile_size):
-        self.tile_size = tile_size
-        self.body = [initial_position]
+    # Positions are (x, y) cell indices
+    def __init__(self, initial_position, board=None):
+        self.body = deque([initial_position])  # Head at the left end, tail at the right
+        self.occupied = {initial_position: 1}  # Segment count per position for O(1) lookups
+
+        # Optional board whose free-cell index follows the snake's movement
+        self.board = board
+        if self.board is not None:
+            self.board.occupy(initial_position)
         self.direction = None  # Start with no direction
         self.growing = False
 
@@ -31,21 +40,25 @@ class Snake:
         head_x, head_y = self.body[0]
 
         # what direction the snake is moving
-        if self.direction == 'UP':
-            new_head = (head_x, head_y - self.tile_size)
-        elif self.direction == 'DOWN':
-            new_head = (head_x, head_y + self.tile_size)
-        elif self.direction == 'LEFT':
-            new_head = (head_x - self.tile_size, head_y)
-        elif self.direction == 'RIGHT':
-            new_head = (head_x + self.tile_size, head_y)
+        dx, dy = DIRECTION_OFFSETS[self.direction]
+        new_head = (head_x + dx, head_y + dy)
 
         # move the head forward one
-        self.body.insert(0, new_head)
+        self.body.appendleft(new_head)
+        self.occupied[new_head] = self.occupied.get(new_head, 0) + 1
+        if self.board is not None:
+            self.board.occupy(new_head)
 
         # pop the last segment of its body 
         if not self.growing:
-            self.body.pop()
+            tail = self.body.pop()
+            count = self.occupied[tail] - 1
+            if count:
+                self.occupied[tail] = count
+            else:
+                del self.occupied[tail]
+                if self.board is not None:
+                    self.board.release(tail)
         else:
             self.growing = False
 
@@ -57,57 +70,41 @@ class Snake:
     def head_position(self):
         return self.body[0]
 
+    # check if any segment of the snake is on a position
+    def occupies(self, position):
+        return position in self.occupied
+
     def has_collision(self, board):
-        # Check for self-collision
-        if self.head_position() in self.body[1:]:
+        # Check for self-collision, the head counts once so any overlap means a second segment
+        if self.occupied[self.head_position()] > 1:
             return True
 
         # Check for wall collision
         if board.is_wall(self.head_position()):
             return True
 
-    # draw the snake on the board
-    def draw(self, surface):
-        for segment in self.body:
-            x, y = segment
-            pygame.draw.rect(surface, (0, 255, 0), (x, y, self.tile_size, self.tile_size))
-
     def get_next_head_position(self):
         head_x, head_y = self.head_position()
 
-        if self.direction == "UP":
-            return head_x, head_y - self.tile_size
-        elif self.direction == "DOWN":
-            return head_x, head_y + self.tile_size
-        elif self.direction == "LEFT":
-            return head_x - self.tile_size, head_y
-        elif self.direction == "RIGHT":
-            return head_x + self.tile_size, head_y
-
         # If no direction is set, return the current head position
-        return head_x, head_y
+        dx, dy = DIRECTION_OFFSETS.get(self.direction, (0, 0))
+        return head_x + dx, head_y + dy
 
     def will_collide(self, direction, board_width, board_height, walls):
         
         head_x, head_y = self.head_position()
 
-        if direction == "UP":
-            new_head = (head_x, head_y - self.tile_size)
-        elif direction == "DOWN":
-            new_head = (head_x, head_y + self.tile_size)
-        elif direction == "LEFT":
-            new_head = (head_x - self.tile_size, head_y)
-        elif direction == "RIGHT":
-            new_head = (head_x + self.tile_size, head_y)
-        else:
+        if direction not in DIRECTION_OFFSETS:
             return False
+        dx, dy = DIRECTION_OFFSETS[direction]
+        new_head = (head_x + dx, head_y + dy)
 
         # Check board boundaries
         if not (0 <= new_head[0] < board_width and 0 <= new_head[1] < board_height):
             return True
 
         # Check collision with the snake's body
-        if new_head in self.body:
+        if new_head in self.occupied:
             return True
 
         # Check collision with walls
@@ -118,19 +115,7 @@ class Snake:
 
     
     def turn_left(self):
-        turn_map = {
-            "UP": "LEFT",
-            "DOWN": "RIGHT",
-            "LEFT": "DOWN",
-            "RIGHT": "UP"
-        }
-        return turn_map[self.direction] if self.direction else None
+        return TURN_LEFT[self.direction] if self.direction else None
 
     def turn_right(self):
-        turn_map = {
-            "UP": "RIGHT",
-            "DOWN": "LEFT",
-            "LEFT": "UP",
-            "RIGHT": "DOWN"
-        }
-        return turn_map[self.direction] if self.direction else None
\ No newline at end of file
+        return TURN_RIGHT[self.direction] if self.direction else None
\ No newline at end of file